@@ -4,12 +4,26 @@ OCTO Cost Estimator
 Real-time cost calculation and tracking for OpenClaw API usage.
 """
 
+import copy
 import json
+import math
 import os
-from datetime import datetime, date
+import re
+import sys
+import threading
+import time
+import weakref
+import zlib
+from datetime import datetime, date, time as dt_time, timedelta
 from pathlib import Path
 from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any
+from functools import cached_property, lru_cache
+from typing import Optional, Callable, Dict, Any, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # cost log lines are encoded with stdlib json instead
+    orjson = None
 
 # Default paths
 OCTO_HOME = Path(os.environ.get('OCTO_HOME', Path.home() / '.octo'))
@@ -18,8 +32,207 @@ LIB_DIR = Path(__file__).parent.parent
 # Load pricing
 PRICING_FILE = LIB_DIR / 'config' / 'model_pricing.json'
 
+# Pricing used for unknown models and when no pricing file is present
+DEFAULT_MODEL = 'claude-sonnet-4-20250514'
+DEFAULT_MODEL_PRICING = {
+    'input_per_million': 3.00,
+    'output_per_million': 15.00,
+    'cache_read_per_million': 0.30,
+    'cache_write_per_million': 3.75,
+}
+RATE_FIELDS = ('input_per_million', 'output_per_million', 'cache_read_per_million', 'cache_write_per_million')
+
+# Buffered bytes that force a flush of the daily cost log
+WRITE_BUFFER_SIZE = 64 * 1024
+
+# Distinct (rates, token counts) combinations whose Cost is memoized
+COST_CACHE_SIZE = 4096
+
+# Chunk size for reading the daily log
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes of the daily log checksummed into the summary sidecar, so a
+# log recreated in place isn't mistaken for the one the sidecar describes
+SUMMARY_HEAD_BYTES = 4096
+
+# Buffered records are flushed once this many are pending, or this many
+# milliseconds after the first one (0 disables the timer)
+BATCH_SIZE = int(os.environ.get('OCTO_COST_BATCH_SIZE', 64))
+BATCH_FLUSH_MS = int(os.environ.get('OCTO_COST_FLUSH_MS', 50))
+
+# Parsed JSON files shared across instances (pricing here, tier config in model_tier)
+JSON_CACHE_SIZE = 32
+
+# Slotted dataclasses need Python 3.10+; older interpreters get regular ones
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@lru_cache(maxsize=JSON_CACHE_SIZE)
+def _read_json_file(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a JSON file once per (path, mtime, size); the result is shared, so callers copy it."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_json_file(path: Path) -> Optional[Dict[str, Any]]:
+    """Parsed contents of a JSON file, or None if it doesn't exist. Each call gets its own copy."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return copy.deepcopy(_read_json_file(str(path), stat.st_mtime_ns, stat.st_size))
+
+
+# JSON encoder for the cost log: orjson when installed, stdlib json otherwise
+if orjson is not None:
+    def _dumps_line(obj: Dict[str, Any]) -> bytes:
+        return orjson.dumps(obj) + b'\n'
+else:
+    def _dumps_line(obj: Dict[str, Any]) -> bytes:
+        return (json.dumps(obj) + '\n').encode()
+
+# JSON decoder for logged records; both take bytes and raise a ValueError subclass
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _decode_record(line: bytes) -> Optional[Dict[str, Any]]:
+    """Decode a logged record, or None if the line isn't a JSON object."""
+    try:
+        entry = _loads(line)
+    except ValueError:
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+# (epoch second, formatted 'YYYY-MM-DDTHH:MM:SS') of the last timestamp; records
+# within a second reuse it. Replaced as one tuple so threads never see a torn pair.
+_timestamp_prefix = (None, '')
+
+
+def _format_timestamp(ts: float) -> str:
+    """Format an epoch timestamp as UTC ISO-8601 with millisecond precision."""
+    global _timestamp_prefix
+    # Round the fraction to the microsecond first, as datetime.fromtimestamp does
+    frac, second = math.modf(ts)
+    second, micros = int(second), round(frac * 1_000_000)
+    if micros == 1_000_000:
+        second, micros = second + 1, 0
+    cached_second, prefix = _timestamp_prefix
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _timestamp_prefix = (second, prefix)
+    return f'{prefix}.{micros // 1000:03d}Z'
+
+
+def _write_all(fd: int, data: bytes):
+    """Write all of data to fd, retrying short writes."""
+    while data:
+        written = os.write(fd, data)
+        data = data[written:]
+
+
+def _close_log(fd: int, buffer: List[bytes]):
+    """Write out a log's buffered records and close its descriptor."""
+    try:
+        _write_all(fd, b''.join(buffer))
+    finally:
+        buffer.clear()
+        os.close(fd)
+
+
+# Fields summed by get_daily_summary, pulled straight out of the raw record
+# bytes so the summary never builds a dict per line
+_SUMMARY_FIELDS = (b'total', b'input_tokens', b'output_tokens', b'cache_read_tokens')
+_NUMBER = rb'\s*:\s*(-?[0-9][0-9.eE+-]*)'
+_SUMMARY_FIELD_RE = re.compile(rb'"(' + b'|'.join(_SUMMARY_FIELDS) + rb')"' + _NUMBER)
+_SUMMARY_FIELD_RES = {field: re.compile(rb'"' + field + rb'"' + _NUMBER) for field in _SUMMARY_FIELDS}
+
+
+def _sum_numbers(values) -> Any:
+    """Sum numeric byte strings, as ints when they all are."""
+    try:
+        return sum(map(int, values))
+    except ValueError:
+        return sum(map(float, values))
 
-@dataclass
+
+class _BatchFlusher:
+    """One daemon thread that flushes estimators' partial batches when due."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._due: 'weakref.WeakKeyDictionary[CostEstimator, float]' = weakref.WeakKeyDictionary()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, estimator: 'CostEstimator', delay: float):
+        """Flush estimator after delay seconds, unless it is flushed first."""
+        with self._cond:
+            self._due[estimator] = time.monotonic() + delay
+            self._start()
+            self._cond.notify()
+
+    def cancel(self, estimator: 'CostEstimator'):
+        """Drop a pending flush."""
+        with self._cond:
+            self._due.pop(estimator, None)
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='octo-cost-flusher', daemon=True)
+            self._thread.start()
+
+    def _after_fork(self):
+        # The child has no flusher thread, the lock may have been held mid-fork,
+        # and the pending batches are the parent's to write
+        self._cond = threading.Condition()
+        self._thread = None
+        self._due = weakref.WeakKeyDictionary()
+
+    def _run(self):
+        while True:
+            self._flush(self._wait_for_due())
+
+    def _wait_for_due(self) -> List['CostEstimator']:
+        """Block until at least one flush is due; remove and return those estimators."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                due = [estimator for estimator, deadline in self._due.items() if deadline <= now]
+                if due:
+                    for estimator in due:
+                        del self._due[estimator]
+                    return due
+                next_deadline = min(self._due.values(), default=None)
+                self._cond.wait(None if next_deadline is None else next_deadline - now)
+
+    @staticmethod
+    def _flush(estimators: List['CostEstimator']):
+        # Kept out of _run so no estimator stays referenced while the thread waits
+        for estimator in estimators:
+            try:
+                estimator.flush()
+            except OSError:
+                pass  # the records stay buffered for the next flush
+
+
+_flusher = _BatchFlusher()
+
+# Every live estimator, so a forked child can drop what it inherited
+_estimators: 'weakref.WeakSet[CostEstimator]' = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    """Leave the parent's buffered records and open logs to the parent."""
+    _flusher._after_fork()
+    for estimator in list(_estimators):
+        estimator._discard_inherited_writer()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+@dataclass(frozen=True, **_SLOTS)
 class Cost:
     """Cost breakdown for a single request."""
     input_cost: float = 0.0
@@ -30,18 +243,18 @@ class Cost:
 
     def __post_init__(self):
         if self.total == 0.0:
-            self.total = (
+            object.__setattr__(self, 'total', (
                 self.input_cost +
                 self.output_cost +
                 self.cache_read_cost +
                 self.cache_write_cost
-            )
+            ))
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class RequestCost:
     """Full cost record for a request."""
-    timestamp: str
+    timestamp: float  # epoch seconds, formatted when recorded
     model: str
     input_tokens: int
     output_tokens: int
@@ -55,56 +268,109 @@ class RequestCost:
         return self.cost.total
 
 
+@lru_cache(maxsize=COST_CACHE_SIZE)
+def _price_tokens(rates: Tuple[float, float, float, float], input_tokens: int, output_tokens: int,
+                  cache_read: int, cache_write: int) -> Cost:
+    """Price token counts at (input, output, cache_read, cache_write) per-token rates."""
+    input_rate, output_rate, cache_read_rate, cache_write_rate = rates
+
+    # Actual input = total - cached
+    actual_input = max(0, input_tokens - cache_read)
+
+    input_cost = actual_input * input_rate
+    output_cost = output_tokens * output_rate
+    cache_read_cost = cache_read * cache_read_rate
+    cache_write_cost = cache_write * cache_write_rate
+
+    return Cost(
+        input_cost=input_cost,
+        output_cost=output_cost,
+        cache_read_cost=cache_read_cost,
+        cache_write_cost=cache_write_cost,
+        total=input_cost + output_cost + cache_read_cost + cache_write_cost,
+    )
+
+
 class CostEstimator:
     """Calculate and track API costs."""
 
-    def __init__(self):
-        self.pricing = self._load_pricing()
-        self.costs_dir = OCTO_HOME / 'costs'
+    def __init__(self, pricing_path: Optional[Path] = None,
+                 pricing: Optional[Dict[str, Any]] = None,
+                 costs_dir: Optional[Path] = None):
+        # Pricing is loaded on first use; recording and summaries don't need it
+        self._pricing_path = Path(pricing_path) if pricing_path else PRICING_FILE
+        if pricing is not None:
+            self.pricing = pricing  # already parsed by the caller, skip the file
+        self.costs_dir = Path(costs_dir) if costs_dir else OCTO_HOME / 'costs'
         self.costs_dir.mkdir(parents=True, exist_ok=True)
+        self._paths_day: Optional[date] = None
+        self._paths: Optional[Tuple[Path, Path]] = None
+
+        # Daily log descriptor (O_APPEND), kept open and rotated when the date changes
+        self._write_fd: Optional[int] = None
+        self._write_date: Optional[date] = None
+        self._write_until = 0.0
+        self._write_closer: Optional[weakref.finalize] = None
+
+        # Encoded records not yet written, and whether _flusher will flush them
+        self._write_buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._flush_scheduled = False
+        self._write_lock = threading.RLock()
+        _estimators.add(self)
+
+    def __enter__(self) -> 'CostEstimator':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @cached_property
+    def pricing(self) -> Dict[str, Any]:
+        """Pricing data, loaded from the config file on first access."""
+        return self._load_pricing()
+
+    @cached_property
+    def _pricing_table(self) -> Dict[str, Tuple[float, float, float, float]]:
+        return self._build_pricing_table(self.pricing)
+
+    @cached_property
+    def _default_rates(self) -> Tuple[float, float, float, float]:
+        return self._pricing_table.get(DEFAULT_MODEL, self._per_token_rates(DEFAULT_MODEL_PRICING))
 
     def _load_pricing(self) -> Dict[str, Any]:
         """Load pricing data from config file."""
-        if PRICING_FILE.exists():
-            with open(PRICING_FILE) as f:
-                return json.load(f)
+        pricing = load_json_file(self._pricing_path)
+        if pricing is not None:
+            return pricing
         return {
-            'models': {
-                'claude-sonnet-4-20250514': {
-                    'input_per_million': 3.00,
-                    'output_per_million': 15.00,
-                    'cache_read_per_million': 0.30,
-                    'cache_write_per_million': 3.75,
-                }
-            },
+            'models': {DEFAULT_MODEL: dict(DEFAULT_MODEL_PRICING)},
             'aliases': {}
         }
 
-    def _resolve_model(self, model: str) -> str:
-        """Resolve model alias to full model ID."""
-        aliases = self.pricing.get('aliases', {})
-        return aliases.get(model, model)
+    @staticmethod
+    def _per_token_rates(model_pricing: Dict[str, float]) -> Tuple[float, float, float, float]:
+        """Convert per-million prices to (input, output, cache_read, cache_write) per-token rates."""
+        return tuple(model_pricing[field] / 1_000_000 for field in RATE_FIELDS)
 
-    def _get_model_pricing(self, model: str) -> Dict[str, float]:
-        """Get pricing for a model."""
-        model_id = self._resolve_model(model)
-        models = self.pricing.get('models', {})
+    def _build_pricing_table(self, pricing: Dict[str, Any]) -> Dict[str, Tuple[float, float, float, float]]:
+        """Flatten pricing into one lookup keyed by model ID and alias; a model missing a rate is an error."""
+        table = {}
+        for model_id, model_pricing in pricing.get('models', {}).items():
+            missing = [field for field in RATE_FIELDS if field not in model_pricing]
+            if missing:
+                raise ValueError(f"Pricing for model '{model_id}' is missing {', '.join(missing)}")
+            table[model_id] = self._per_token_rates(model_pricing)
 
-        if model_id in models:
-            return models[model_id]
+        for alias, model_id in pricing.get('aliases', {}).items():
+            if model_id in table:
+                table[alias] = table[model_id]
 
-        # Default to Sonnet pricing
-        return models.get('claude-sonnet-4-20250514', {
-            'input_per_million': 3.00,
-            'output_per_million': 15.00,
-            'cache_read_per_million': 0.30,
-            'cache_write_per_million': 3.75,
-        })
+        return table
 
     def calculate(self, request: Dict[str, Any], response: Dict[str, Any]) -> RequestCost:
         """Calculate cost for a request/response pair."""
-        model = response.get('model', 'claude-sonnet-4-20250514')
-        pricing = self._get_model_pricing(model)
+        model = response.get('model', DEFAULT_MODEL)
 
         usage = response.get('usage', {})
         input_tokens = usage.get('input_tokens', 0)
@@ -112,35 +378,42 @@ class CostEstimator:
         cache_read = usage.get('cache_read_input_tokens', 0)
         cache_write = usage.get('cache_creation_input_tokens', 0)
 
-        # Actual input = total - cached
-        actual_input = max(0, input_tokens - cache_read)
-
-        cost = Cost(
-            input_cost=(actual_input / 1_000_000) * pricing['input_per_million'],
-            output_cost=(output_tokens / 1_000_000) * pricing['output_per_million'],
-            cache_read_cost=(cache_read / 1_000_000) * pricing['cache_read_per_million'],
-            cache_write_cost=(cache_write / 1_000_000) * pricing['cache_write_per_million'],
-        )
-
         return RequestCost(
-            timestamp=datetime.utcnow().isoformat() + 'Z',
+            timestamp=time.time(),
             model=model,
             input_tokens=input_tokens,
             output_tokens=output_tokens,
             cache_read_tokens=cache_read,
             cache_write_tokens=cache_write,
-            cost=cost,
+            cost=self._cost_for(model, input_tokens, output_tokens, cache_read, cache_write),
         )
 
-    def record(self, request_cost: RequestCost, session_id: Optional[str] = None):
-        """Record a cost to the daily log file."""
-        request_cost.session_id = session_id
+    def calculate_batch(self, model: str, usages: List[Dict[str, Any]]) -> List[Cost]:
+        """Price many usage dicts for one model; returns one Cost per usage, in order."""
+        cost_for = self._cost_for
+        return [
+            cost_for(
+                model,
+                usage.get('input_tokens', 0),
+                usage.get('output_tokens', 0),
+                usage.get('cache_read_input_tokens', 0),
+                usage.get('cache_creation_input_tokens', 0),
+            )
+            for usage in usages
+        ]
+
+    def _cost_for(self, model: str, input_tokens: int, output_tokens: int,
+                  cache_read: int, cache_write: int) -> Cost:
+        """Price one request's token counts at the model's rates."""
+        rates = self._pricing_table.get(model, self._default_rates)
+        return _price_tokens(rates, input_tokens, output_tokens, cache_read, cache_write)
 
-        today = date.today().isoformat()
-        cost_file = self.costs_dir / f'{today}.jsonl'
+    def record(self, request_cost: RequestCost, session_id: Optional[str] = None, durable: bool = False):
+        """Record a cost to the daily log file, buffered unless durable=True."""
+        request_cost.session_id = session_id
 
         record = {
-            'timestamp': request_cost.timestamp,
+            'timestamp': _format_timestamp(request_cost.timestamp),
             'model': request_cost.model,
             'input_tokens': request_cost.input_tokens,
             'output_tokens': request_cost.output_tokens,
@@ -154,17 +427,92 @@ class CostEstimator:
             'session_id': session_id,
         }
 
-        with open(cost_file, 'a') as f:
-            f.write(json.dumps(record) + '\n')
+        line = _dumps_line(record)
+
+        with self._write_lock:
+            if self._write_fd is None or time.time() >= self._write_until:
+                self._open_writer(date.today())
+
+            self._write_buffer.append(line)
+            self._buffered_bytes += len(line)
+
+            if durable:
+                self.flush()
+                os.fsync(self._write_fd)
+            elif len(self._write_buffer) >= BATCH_SIZE or self._buffered_bytes >= WRITE_BUFFER_SIZE:
+                self.flush()
+            elif not self._flush_scheduled and BATCH_FLUSH_MS > 0:
+                self._flush_scheduled = True
+                _flusher.schedule(self, BATCH_FLUSH_MS / 1000)
+
+    def _open_writer(self, day: date):
+        """Open (or rotate to) the append descriptor for a day's log."""
+        self.close()
+        cost_file, _ = self._daily_paths(day)
+        self._write_fd = os.open(cost_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # Flushes and closes the descriptor if close() is never called,
+        # without keeping the estimator alive
+        self._write_closer = weakref.finalize(self, _close_log, self._write_fd, self._write_buffer)
+        self._write_date = day
+        # Local midnight ending the day; record() compares against it instead of re-deriving the date
+        self._write_until = datetime.combine(day + timedelta(days=1), dt_time.min).timestamp()
+
+    def _daily_paths(self, day: date) -> Tuple[Path, Path]:
+        """Return (log, summary sidecar) paths for a day, reusing the last day's."""
+        if day != self._paths_day:
+            iso = day.isoformat()
+            self._paths = (self.costs_dir / f'{iso}.jsonl', self.costs_dir / f'{iso}.summary.json')
+            self._paths_day = day
+        return self._paths
+
+    def _discard_inherited_writer(self):
+        """In a forked child, drop the buffer and descriptor copied from the parent without writing."""
+        self._write_lock = threading.RLock()
+        self._write_buffer.clear()
+        self._buffered_bytes = 0
+        self._flush_scheduled = False
+        if self._write_closer is not None:
+            self._write_closer.detach()
+            os.close(self._write_fd)
+            self._write_closer = None
+            self._write_fd = None
+            self._write_date = None
+
+    def flush(self):
+        """Write any buffered cost records to disk in a single append."""
+        with self._write_lock:
+            if self._flush_scheduled:
+                self._flush_scheduled = False
+                _flusher.cancel(self)
+            if self._write_buffer and self._write_fd is not None:
+                _write_all(self._write_fd, b''.join(self._write_buffer))
+            self._write_buffer.clear()
+            self._buffered_bytes = 0
+
+    def close(self):
+        """Flush and close the daily log descriptor."""
+        with self._write_lock:
+            self.flush()
+            if self._write_closer is not None:
+                self._write_closer()
+                self._write_closer = None
+                self._write_fd = None
+                self._write_date = None
 
     def get_daily_summary(self, day: Optional[date] = None) -> Dict[str, Any]:
         """Get cost summary for a specific day."""
+        self.flush()
+
         if day is None:
             day = date.today()
 
-        cost_file = self.costs_dir / f'{day.isoformat()}.jsonl'
+        cost_file, summary_file = self._daily_paths(day)
 
         if not cost_file.exists():
+            try:
+                summary_file.unlink()
+            except OSError:
+                pass
             return {
                 'date': day.isoformat(),
                 'requests': 0,
@@ -174,33 +522,154 @@ class CostEstimator:
                 'cache_read_tokens': 0,
             }
 
-        total_cost = 0.0
-        total_requests = 0
-        total_input = 0
-        total_output = 0
-        total_cached = 0
-
-        with open(cost_file) as f:
-            for line in f:
-                try:
-                    record = json.loads(line)
-                    total_cost += record.get('total', 0)
-                    total_requests += 1
-                    total_input += record.get('input_tokens', 0)
-                    total_output += record.get('output_tokens', 0)
-                    total_cached += record.get('cache_read_tokens', 0)
-                except json.JSONDecodeError:
-                    continue
+        # Totals up to a byte offset are kept in a sidecar; only records
+        # appended since then are scanned
+        offset, total_requests, sums, log_id = self._load_summary_state(summary_file)
+
+        pending = b''
+
+        with open(cost_file, 'rb', buffering=0) as f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            if offset and (size < offset or log_id is None
+                           or log_id != self._log_identity(f.fileno(), stat, log_id[2])):
+                # Log was truncated, replaced or recreated; start over
+                offset, total_requests, sums, log_id = self._load_summary_state(None)
+            scanned_from = offset
+            f.seek(offset)
+
+            # Read in fixed chunks, scanning the complete lines of each and
+            # carrying a split line over to the next chunk
+            remaining = size - offset
+            while remaining > 0:
+                chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                data = pending + chunk if pending else chunk
+                end = data.rfind(b'\n') + 1
+                if end:
+                    total_requests += self._scan_records(data[:end], sums, self._reprice_record)
+                    offset += end
+                pending = data[end:]
+
+            if offset != scanned_from:
+                log_id = self._log_identity(f.fileno(), stat, min(offset, SUMMARY_HEAD_BYTES))
+
+        # Only newline-terminated records are folded into the sidecar; a
+        # trailing line may still be mid-write
+        if offset != scanned_from:
+            self._save_summary_state(summary_file, offset, total_requests, sums, log_id)
+        if pending:
+            sums = dict(sums)
+            total_requests += self._scan_records(pending, sums, self._reprice_record)
 
         return {
             'date': day.isoformat(),
             'requests': total_requests,
-            'total_cost': total_cost,
-            'input_tokens': total_input,
-            'output_tokens': total_output,
-            'cache_read_tokens': total_cached,
+            'total_cost': sums[b'total'],
+            'input_tokens': sums[b'input_tokens'],
+            'output_tokens': sums[b'output_tokens'],
+            'cache_read_tokens': sums[b'cache_read_tokens'],
         }
 
+    @staticmethod
+    def _log_identity(fd: int, stat: os.stat_result, head_len: int) -> List[int]:
+        """Identify a daily log as [st_dev, st_ino, head length, CRC-32 of its first head_len bytes]."""
+        head = os.pread(fd, head_len, 0)
+        return [stat.st_dev, stat.st_ino, len(head), zlib.crc32(head)]
+
+    @staticmethod
+    def _load_summary_state(summary_file: Optional[Path]) -> Tuple[int, int, Dict[bytes, Any], Optional[List[int]]]:
+        """Return (offset, requests, sums, log identity) from a summary sidecar, or an empty state."""
+        sums = {b'total': 0.0, b'input_tokens': 0, b'output_tokens': 0, b'cache_read_tokens': 0}
+        if summary_file is None:
+            return 0, 0, sums, None
+        try:
+            with open(summary_file) as f:
+                state = json.load(f)
+            for field in _SUMMARY_FIELDS:
+                sums[field] += state[field.decode()]
+            log_id = [int(value) for value in state['log']]
+            if len(log_id) != 4:
+                raise ValueError('bad log identity')
+            return int(state['offset']), int(state['requests']), sums, log_id
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, unreadable or pre-identity sidecar: rebuild from the start of the log
+            return CostEstimator._load_summary_state(None)
+
+    @staticmethod
+    def _save_summary_state(summary_file: Path, offset: int, requests: int,
+                            sums: Dict[bytes, Any], log_id: List[int]):
+        """Atomically replace the summary sidecar."""
+        state = {'offset': offset, 'requests': requests, 'log': log_id}
+        state.update((field.decode(), value) for field, value in sums.items())
+        tmp_file = summary_file.with_name(f'.{summary_file.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_file, summary_file)
+        except OSError:
+            pass  # the sidecar is only a cache
+
+    @staticmethod
+    def _scan_records(buf: bytes, sums: Dict[bytes, Any],
+                      reprice: Optional[Callable[[Dict[str, Any]], float]] = None) -> int:
+        """Add summary fields from a buffer of JSONL records into sums; return the record count."""
+        lines = buf.count(b'\n')
+        if (lines and buf.startswith(b'{') and buf.endswith(b'}\n')
+                and buf.count(b'}\n') == lines and buf.count(b'\n{') == lines - 1):
+            # Every line is a complete record (the normal case): sum each field
+            # over the whole buffer, leaving the per-value work to C loops
+            found = {field: pattern.findall(buf) for field, pattern in _SUMMARY_FIELD_RES.items()}
+            if len(found[b'total']) == lines:
+                for field, values in found.items():
+                    sums[field] += _sum_numbers(values)
+                return lines
+
+        findall = _SUMMARY_FIELD_RE.findall
+        size = len(buf)
+        count = 0
+        pos = 0
+
+        while pos < size:
+            end = buf.find(b'\n', pos)
+            if end == -1:
+                end = size
+            last = end - 1
+            if last > pos and buf[last] == 0x0D:  # tolerate CRLF
+                last -= 1
+            # Blank and partially written lines never look like {...}
+            if last > pos and buf[pos] == 0x7B and buf[last] == 0x7D:
+                found = findall(buf, pos, end)
+                has_total = any(key == b'total' for key, _ in found)
+                # Without a stored total the line is decoded, so a corrupt one isn't counted
+                entry = None if has_total else _decode_record(buf[pos:end])
+                if has_total or entry is not None:
+                    count += 1
+                    for key, value in found:
+                        sums[key] += int(value) if value.isdigit() else float(value)
+                    if entry is not None and reprice is not None:
+                        sums[b'total'] += reprice(entry)
+            pos = end + 1
+
+        return count
+
+    def _reprice_record(self, entry: Dict[str, Any]) -> float:
+        """Price a logged record that has no stored total (written by an older version)."""
+        try:
+            return self.calculate({}, {
+                'model': entry.get('model', DEFAULT_MODEL),
+                'usage': {
+                    'input_tokens': entry.get('input_tokens', 0),
+                    'output_tokens': entry.get('output_tokens', 0),
+                    'cache_read_input_tokens': entry.get('cache_read_tokens', 0),
+                    'cache_creation_input_tokens': entry.get('cache_write_tokens', 0),
+                },
+            }).total
+        except (ValueError, TypeError, AttributeError):
+            return 0.0
+
     def estimate_savings(self, with_caching: bool = True, with_tiering: bool = True) -> Dict[str, float]:
         """Estimate savings from OCTO optimizations."""
         today = self.get_daily_summary()
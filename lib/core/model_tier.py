@@ -5,16 +5,29 @@ Intelligent model selection based on request classification.
 """
 
 import re
-import json
 import os
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
 
+from cost_estimator import load_json_file
+
+try:
+    import re2
+except ImportError:  # optional linear-time engine, stdlib re is the fallback
+    re2 = None
+
 # Default paths
 OCTO_HOME = Path(os.environ.get('OCTO_HOME', Path.home() / '.octo'))
 LIB_DIR = Path(__file__).parent.parent
 
+# Numbered backreferences (\1..\9) would point at the wrong group once patterns are fused
+_BACKREF_RE = re.compile(r'\\[1-9]')
+
+# Leading characters of a message that classify() scans. The ask comes first,
+# and the ".*" patterns backtrack quadratically on long pastes.
+MAX_CLASSIFY_CHARS = 512
+
 
 @dataclass
 class TierDecision:
@@ -77,16 +90,15 @@ class ModelTier:
 
     def _load_config(self, config_path: Optional[Path] = None) -> Dict[str, Any]:
         """Load configuration from file or use defaults."""
-        if config_path and config_path.exists():
-            with open(config_path) as f:
-                return json.load(f)
+        if config_path:
+            config = load_json_file(Path(config_path))
+            if config is not None:
+                return config
 
         # Try default config location
-        default_config = OCTO_HOME / 'config.json'
-        if default_config.exists():
-            with open(default_config) as f:
-                full_config = json.load(f)
-                return full_config.get('optimization', {}).get('modelTiering', {})
+        full_config = load_json_file(OCTO_HOME / 'config.json')
+        if full_config is not None:
+            return full_config.get('optimization', {}).get('modelTiering', {})
 
         return {}
 
@@ -94,15 +106,70 @@ class ModelTier:
         """Compile regex patterns for efficient matching."""
         config = self.config
 
-        # Get patterns from config or use defaults
-        haiku_patterns = config.get('haikuPatterns', self.DEFAULT_HAIKU_PATTERNS)
-        opus_patterns = config.get('opusPatterns', self.DEFAULT_OPUS_PATTERNS)
-        sonnet_patterns = config.get('sonnetPatterns', self.DEFAULT_SONNET_PATTERNS)
-
-        # Compile patterns
-        self.haiku_patterns = [(p, re.compile(p, re.IGNORECASE)) for p in haiku_patterns]
-        self.opus_patterns = [(p, re.compile(p, re.IGNORECASE)) for p in opus_patterns]
-        self.sonnet_patterns = [(p, re.compile(p, re.IGNORECASE)) for p in sonnet_patterns]
+        # Report every matching pattern instead of stopping at the first (debugging aid)
+        self._collect_all = bool(config.get('collectAllMatches', False))
+        # 0 scans the whole message
+        self._max_chars = int(config.get('maxClassifyChars', MAX_CLASSIFY_CHARS))
+
+        # Default patterns are compiled once at import; only custom ones are compiled here
+        if 'haikuPatterns' in config:
+            self.haiku_patterns, self._haiku_fused = self._compile_tier(config['haikuPatterns'])
+        else:
+            self.haiku_patterns, self._haiku_fused = _DEFAULT_HAIKU_COMPILED
+
+        if 'opusPatterns' in config:
+            self.opus_patterns, self._opus_fused = self._compile_tier(config['opusPatterns'])
+        else:
+            self.opus_patterns, self._opus_fused = _DEFAULT_OPUS_COMPILED
+
+        if 'sonnetPatterns' in config:
+            self.sonnet_patterns, self._sonnet_fused = self._compile_tier(config['sonnetPatterns'])
+        else:
+            self.sonnet_patterns, self._sonnet_fused = _DEFAULT_SONNET_COMPILED
+
+    @classmethod
+    def _compile_tier(cls, patterns: List[str]) -> tuple:
+        """Compile a tier's patterns, plus their fused alternation."""
+        compiled = [(p, re.compile(p, re.IGNORECASE)) for p in patterns]
+        return compiled, cls._fuse_patterns(patterns)
+
+    @staticmethod
+    def _fuse_patterns(patterns: List[str]):
+        """Combine a tier's patterns into one alternation, or None if they can't be fused."""
+        if not patterns or any(_BACKREF_RE.search(p) for p in patterns):
+            return None
+
+        combined = '|'.join(f'(?P<p{i}>{p})' for i, p in enumerate(patterns))
+
+        if re2 is not None:
+            try:
+                # Inline flag: google-re2 and pyre2 disagree on compile()'s second argument
+                return re2.compile('(?i)' + combined)
+            except Exception:
+                pass  # RE2 rejects lookarounds etc.; fall through to stdlib re
+
+        try:
+            return re.compile(combined, re.IGNORECASE)
+        except re.error:
+            return None
+
+    def _match_tier(self, tier: str, fused, patterns: List[tuple], message: str) -> List[str]:
+        """Return the tier's matching patterns, only the first unless collectAllMatches is set."""
+        if fused is not None:
+            match = fused.search(message)
+            if match is None:
+                return []
+            group = getattr(match, 'lastgroup', None)
+            if group and not self._collect_all:
+                return [f"{tier}:{patterns[int(group[1:])][0]}"]
+
+        matched = []
+        for pattern_str, pattern in patterns:
+            if pattern.search(message):
+                matched.append(f"{tier}:{pattern_str}")
+                if not self._collect_all:
+                    break
+        return matched
 
     def classify(self, message: str, context: Optional[Dict[str, Any]] = None) -> TierDecision:
         """
@@ -116,12 +183,11 @@ class ModelTier:
             TierDecision with recommended model and reasoning
         """
         message = message.strip()
-        matched_patterns = []
+        if self._max_chars:
+            message = message[:self._max_chars]
 
         # Check Haiku patterns first (cheapest)
-        for pattern_str, pattern in self.haiku_patterns:
-            if pattern.search(message):
-                matched_patterns.append(f"haiku:{pattern_str}")
+        matched_patterns = self._match_tier('haiku', self._haiku_fused, self.haiku_patterns, message)
 
         if matched_patterns:
             return TierDecision(
@@ -132,9 +198,7 @@ class ModelTier:
             )
 
         # Check Opus patterns (most expensive, for complex tasks)
-        for pattern_str, pattern in self.opus_patterns:
-            if pattern.search(message):
-                matched_patterns.append(f"opus:{pattern_str}")
+        matched_patterns = self._match_tier('opus', self._opus_fused, self.opus_patterns, message)
 
         if matched_patterns:
             return TierDecision(
@@ -145,9 +209,7 @@ class ModelTier:
             )
 
         # Check Sonnet patterns
-        for pattern_str, pattern in self.sonnet_patterns:
-            if pattern.search(message):
-                matched_patterns.append(f"sonnet:{pattern_str}")
+        matched_patterns = self._match_tier('sonnet', self._sonnet_fused, self.sonnet_patterns, message)
 
         if matched_patterns:
             return TierDecision(
@@ -187,6 +249,12 @@ class ModelTier:
         return True
 
 
+# Compiled default patterns, shared by every ModelTier using them. Treat as read-only.
+_DEFAULT_HAIKU_COMPILED = ModelTier._compile_tier(ModelTier.DEFAULT_HAIKU_PATTERNS)
+_DEFAULT_OPUS_COMPILED = ModelTier._compile_tier(ModelTier.DEFAULT_OPUS_PATTERNS)
+_DEFAULT_SONNET_COMPILED = ModelTier._compile_tier(ModelTier.DEFAULT_SONNET_PATTERNS)
+
+
 def main():
     """CLI interface for model tiering."""
     import sys
@@ -7,10 +7,16 @@ Track session health, context utilization, and growth patterns.
 import json
 import os
 import re
-from datetime import datetime
+import time
+from collections import deque
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Deque, Tuple
+
+try:
+    import orjson
+except ImportError:  # session lines are decoded with stdlib json instead
+    orjson = None
 
 # Default paths
 OCTO_HOME = Path(os.environ.get('OCTO_HOME', Path.home() / '.octo'))
@@ -25,6 +31,26 @@ MODEL_CONTEXT_LIMITS = {
     'default': 200000,
 }
 
+# Session files are read in chunks of this size
+READ_CHUNK_SIZE = 1024 * 1024
+
+# JSON decoder for session lines: orjson when installed, stdlib json otherwise.
+# Both take bytes and raise a ValueError subclass on malformed input.
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Every message entry contains this token (as its type and as its key), so
+# lines without it can be skipped before decoding
+_MESSAGE_TOKEN = b'"message"'
+
+# An injection block is a depth header followed within 200 characters by
+# the recovered-context marker. The marker substring is checked first so
+# the regex only runs on content that can contain a block.
+_INJECTION_MARKER = 'Recovered Conversation Context'
+_INJECTION_MARKER_BYTES = _INJECTION_MARKER.encode()
+_INJECTION_BLOCK_RE = re.compile(
+    r'\[INJECTION-DEPTH:[^\]]*\].{0,200}' + re.escape(_INJECTION_MARKER)
+)
+
 
 @dataclass
 class SessionHealth:
@@ -43,6 +69,66 @@ class SessionHealth:
     recommendation: str
 
 
+def _scan_session_bytes(data: bytes) -> Tuple[int, int, int, Optional[str], int]:
+    """Scan raw session JSONL into (message_count, injection_count, max_nested, model, consumed)."""
+    message_count = 0
+    injection_count = 0
+    max_nested = 0
+    model = None
+
+    lines = data.split(b'\n')
+    tail = lines[-1]  # b'' when data ends with a newline
+    consumed = len(data) - len(tail)
+    if tail:
+        try:
+            _loads(tail)
+            consumed = len(data)
+        except ValueError:
+            lines.pop()  # still being written
+
+    for line in lines:
+        if _MESSAGE_TOKEN not in line:
+            continue
+        try:
+            entry = _loads(line)
+        except ValueError:
+            continue
+
+        if not isinstance(entry, dict) or entry.get('type') != 'message':
+            continue
+        message_count += 1
+        msg = entry.get('message', {})
+
+        # Track model
+        if 'model' in entry:
+            model = entry['model']
+
+        # Count injections in user messages. The marker is plain ASCII and
+        # appears verbatim in the raw line, so most lines skip this entirely.
+        if _INJECTION_MARKER_BYTES in line and isinstance(msg, dict) and msg.get('role') == 'user':
+            content = str(msg.get('content', ''))
+            # Count injection blocks
+            blocks = len(_INJECTION_BLOCK_RE.findall(content))
+            injection_count += blocks
+            max_nested = max(max_nested, blocks)
+
+    return message_count, injection_count, max_nested, model, consumed
+
+
+@dataclass
+class _SessionScan:
+    """Running counters for a session file, covering its first offset bytes."""
+    dev: int = 0
+    ino: int = 0
+    size: int = 0  # size and mtime of the last scan that reached the end of the file
+    mtime_ns: int = 0
+    offset: int = 0
+    message_count: int = 0
+    injection_count: int = 0
+    max_nested: int = 0
+    model: str = 'default'
+
+
 class SessionMonitor:
     """Monitor session health and detect issues."""
 
@@ -56,57 +142,36 @@ class SessionMonitor:
     INJECTION_CRITICAL = 50
     NESTED_INJECTION_WARNING = 1
 
+    # Growth rate window, and the samples per window kept for it. Polls closer
+    # together than GROWTH_WINDOW_SECONDS / GROWTH_HISTORY_SAMPLES replace the
+    # newest sample instead of adding one.
+    GROWTH_WINDOW_SECONDS = 300
+    GROWTH_HISTORY_SAMPLES = 64
+
     def __init__(self, sessions_dir: Optional[Path] = None):
         """Initialize session monitor."""
         self.sessions_dir = sessions_dir or (OPENCLAW_HOME / 'agents' / 'main' / 'sessions')
-        self.size_history: Dict[str, List[tuple]] = {}  # session_id -> [(timestamp, size)]
+        self.size_history: Dict[str, Deque[tuple]] = {}  # session_id -> [(timestamp, size)]
+        self._scan_cache: Dict[str, _SessionScan] = {}  # file path -> counters
 
     def analyze_session(self, session_file: Path) -> SessionHealth:
         """Analyze a single session file."""
         session_id = session_file.stem
 
         # Get file stats
-        file_size = session_file.stat().st_size
+        stat = session_file.stat()
+        file_size = stat.st_size
         file_size_kb = file_size // 1024
 
         # Estimate tokens (rough: ~4 chars per token)
         estimated_tokens = file_size // 4
 
         # Parse session for detailed analysis
-        injection_count = 0
-        max_nested = 0
-        message_count = 0
-        model = 'default'
-
-        try:
-            with open(session_file, 'r') as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line)
-
-                        if entry.get('type') == 'message':
-                            message_count += 1
-                            msg = entry.get('message', {})
-
-                            # Track model
-                            if 'model' in entry:
-                                model = entry['model']
-
-                            # Count injections in user messages
-                            if msg.get('role') == 'user':
-                                content = str(msg.get('content', ''))
-                                # Count injection blocks
-                                blocks = len(re.findall(
-                                    r'\[INJECTION-DEPTH:[^\]]*\].{0,200}Recovered Conversation Context',
-                                    content
-                                ))
-                                injection_count += blocks
-                                max_nested = max(max_nested, blocks)
-
-                    except json.JSONDecodeError:
-                        continue
-        except Exception:
-            pass
+        scan = self._scan_session(session_file, stat)
+        injection_count = scan.injection_count
+        max_nested = scan.max_nested
+        message_count = scan.message_count
+        model = scan.model
 
         # Calculate context utilization
         context_limit = MODEL_CONTEXT_LIMITS.get(model, MODEL_CONTEXT_LIMITS['default'])
@@ -159,21 +224,72 @@ class SessionMonitor:
             recommendation=recommendation,
         )
 
+    def _scan_session(self, session_file: Path, stat: os.stat_result) -> _SessionScan:
+        """Return message and injection counters for a session file, scanning only new bytes."""
+        key = str(session_file)
+        scan = self._scan_cache.get(key)
+        same_file = scan is not None and scan.ino == stat.st_ino and scan.dev == stat.st_dev
+        if same_file and scan.size == stat.st_size and scan.mtime_ns == stat.st_mtime_ns:
+            return scan
+        if not same_file or stat.st_size < scan.offset:
+            scan = _SessionScan(dev=stat.st_dev, ino=stat.st_ino)
+
+        try:
+            fd = os.open(session_file, os.O_RDONLY)
+        except OSError:
+            return scan
+
+        # Read up to the size just stat'ed, in fixed chunks, carrying any
+        # incomplete line over to the next chunk
+        pos = scan.offset
+        try:
+            pending = b''
+            while pos < stat.st_size:
+                chunk = os.pread(fd, min(READ_CHUNK_SIZE, stat.st_size - pos), pos)
+                if not chunk:
+                    break
+                pos += len(chunk)
+                data = pending + chunk if pending else chunk
+
+                messages, injections, nested, model, consumed = _scan_session_bytes(data)
+                scan.offset += consumed
+                scan.message_count += messages
+                scan.injection_count += injections
+                scan.max_nested = max(scan.max_nested, nested)
+                if model is not None:
+                    scan.model = model
+                pending = data[consumed:]
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+        # The counters stay valid up to scan.offset either way, but only a
+        # scan that reached the stat'ed size may vouch for that size and mtime;
+        # after a failed or short read the next call resumes from the offset
+        if pos >= stat.st_size:
+            scan.size = stat.st_size
+            scan.mtime_ns = stat.st_mtime_ns
+        self._scan_cache[key] = scan
+        return scan
+
     def _calculate_growth_rate(self, session_id: str, current_size_kb: int) -> float:
         """Calculate growth rate in KB per minute."""
-        now = datetime.now().timestamp()
+        now = time.time()
 
         # Initialize or update history
-        if session_id not in self.size_history:
-            self.size_history[session_id] = []
-
-        history = self.size_history[session_id]
-        history.append((now, current_size_kb))
+        history = self.size_history.get(session_id)
+        if history is None:
+            history = self.size_history[session_id] = deque()
+        if len(history) >= 2 and now - history[-2][0] < self.GROWTH_WINDOW_SECONDS / self.GROWTH_HISTORY_SAMPLES:
+            history[-1] = (now, current_size_kb)
+        else:
+            history.append((now, current_size_kb))
 
-        # Keep only last 5 minutes of history
-        cutoff = now - 300
-        history = [(t, s) for t, s in history if t > cutoff]
-        self.size_history[session_id] = history
+        # Keep only last 5 minutes of history (oldest samples are at the left)
+        cutoff = now - self.GROWTH_WINDOW_SECONDS
+        while history[0][0] <= cutoff:
+            history.popleft()
 
         if len(history) < 2:
             return 0.0
@@ -191,24 +307,38 @@ class SessionMonitor:
 
     def get_all_sessions(self) -> List[SessionHealth]:
         """Get health status for all active sessions."""
-        sessions = []
-
         if not self.sessions_dir.exists():
-            return sessions
+            return []
+
+        paths = [
+            f for f in self.sessions_dir.glob('*.jsonl')
+            if f.name != 'sessions.json' and '.archived.' not in f.name
+        ]
 
-        for f in self.sessions_dir.glob('*.jsonl'):
-            if f.name == 'sessions.json':
-                continue
-            if '.archived.' in f.name:
-                continue
+        # Analyzed serially: with the scan cache a poll is mostly stat()
+        # calls, and parsing holds the GIL (json and orjson alike), so a
+        # thread pool would only add overhead
+        results = [self._try_analyze_session(f) for f in paths]
 
-            try:
-                health = self.analyze_session(f)
-                sessions.append(health)
-            except Exception:
-                continue
+        self._forget_missing_sessions(paths)
+        return [health for health in results if health is not None]
 
-        return sessions
+    def _forget_missing_sessions(self, paths: List[Path]):
+        """Drop growth history and scan counters for sessions no longer listed."""
+        live_ids = {f.stem for f in paths}
+        for session_id in self.size_history.keys() - live_ids:
+            del self.size_history[session_id]
+
+        live_keys = {str(f) for f in paths}
+        for key in self._scan_cache.keys() - live_keys:
+            del self._scan_cache[key]
+
+    def _try_analyze_session(self, session_file: Path) -> Optional[SessionHealth]:
+        """Analyze a session file, or return None if it can't be read."""
+        try:
+            return self.analyze_session(session_file)
+        except Exception:
+            return None
 
     def get_alerts(self) -> List[SessionHealth]:
         """Get sessions that need attention (WARNING or CRITICAL)."""
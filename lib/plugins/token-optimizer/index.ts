@@ -192,8 +192,19 @@ export function onBeforeRequest(
     config = loadConfig();
   }
 
-  // Apply model tiering
-  if (config.modelTiering.enabled && request.messages?.length > 0) {
+  // Apply model tiering. Only tier down, never up from what's requested,
+  // so Opus and Haiku requests keep their model and skip classification.
+  const currentTier = request.model?.includes('opus')
+    ? 'opus'
+    : request.model?.includes('haiku')
+    ? 'haiku'
+    : 'sonnet';
+
+  if (
+    config.modelTiering.enabled &&
+    currentTier === 'sonnet' &&
+    request.messages?.length > 0
+  ) {
     const lastUserMessage = [...request.messages]
       .reverse()
       .find((m: any) => m.role === 'user');
@@ -204,20 +215,7 @@ export function onBeforeRequest(
           ? lastUserMessage.content
           : JSON.stringify(lastUserMessage.content);
 
-      const recommended = classifyMessage(content);
-
-      // Only tier down, never up from what's requested
-      const currentTier = request.model?.includes('opus')
-        ? 'opus'
-        : request.model?.includes('haiku')
-        ? 'haiku'
-        : 'sonnet';
-
-      if (
-        recommended === 'haiku' &&
-        currentTier !== 'haiku' &&
-        !request.model?.includes('opus')
-      ) {
+      if (classifyMessage(content) === 'haiku') {
         request.model = 'claude-haiku-3-5-20241022';
       }
     }
@@ -5,48 +5,45 @@ Integration tests for cost tracking flow.
 
 import json
 import os
-import sys
-import tempfile
 from datetime import datetime
-from pathlib import Path
 
 import pytest
 
-# Add lib/core to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib" / "core"))
+from cost_estimator import PRICING_FILE, CostEstimator
 
-from cost_estimator import CostEstimator
+
+@pytest.fixture(scope="session")
+def _pricing_dict():
+    """Bundled pricing, parsed once for every estimator in the session."""
+    return json.loads(PRICING_FILE.read_text())
 
 
 class TestCostTrackingFlow:
     """End-to-end tests for cost tracking."""
 
     @pytest.fixture
-    def temp_env(self):
+    def temp_env(self, tmp_path):
         """Create temporary test environment."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmpdir = Path(tmpdir)
-
-            # Create OCTO home
-            octo_home = tmpdir / "octo"
-            octo_home.mkdir()
-            (octo_home / "costs").mkdir()
-            (octo_home / "config.json").write_text(json.dumps({
-                "version": "1.0.0",
-                "costTracking": {"enabled": True}
-            }))
-
-            # Create OpenClaw home
-            openclaw_home = tmpdir / "openclaw"
-            sessions_dir = openclaw_home / "agents" / "main" / "sessions"
-            sessions_dir.mkdir(parents=True)
-
-            yield {
-                "tmpdir": tmpdir,
-                "octo_home": octo_home,
-                "openclaw_home": openclaw_home,
-                "costs_dir": octo_home / "costs"
-            }
+        # Create OCTO home
+        octo_home = tmp_path / "octo"
+        octo_home.mkdir()
+        (octo_home / "costs").mkdir()
+        (octo_home / "config.json").write_text(json.dumps({
+            "version": "1.0.0",
+            "costTracking": {"enabled": True}
+        }))
+
+        # Create OpenClaw home
+        openclaw_home = tmp_path / "openclaw"
+        sessions_dir = openclaw_home / "agents" / "main" / "sessions"
+        sessions_dir.mkdir(parents=True)
+
+        return {
+            "tmpdir": tmp_path,
+            "octo_home": octo_home,
+            "openclaw_home": openclaw_home,
+            "costs_dir": octo_home / "costs"
+        }
 
     def test_plugin_records_cost_on_request(self, temp_env):
         """Plugin records cost when request completes."""
@@ -211,11 +208,11 @@ class TestCostTrackingEdgeCases:
     """Edge case tests for cost tracking."""
 
     @pytest.fixture
-    def estimator(self, tmp_path):
+    def estimator(self, tmp_path, _pricing_dict):
         """Create estimator with temp directory."""
         costs_dir = tmp_path / "costs"
         costs_dir.mkdir()
-        return CostEstimator(costs_dir=str(costs_dir))
+        return CostEstimator(costs_dir=str(costs_dir), pricing=_pricing_dict)
 
     def test_handles_empty_usage(self, estimator):
         """Handles empty usage dictionary."""
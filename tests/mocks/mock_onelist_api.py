@@ -5,94 +5,141 @@ Mock Onelist API server for OCTO testing.
 
 import json
 import sys
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+try:
+    import orjson
+except ImportError:  # responses are encoded with stdlib json instead
+    orjson = None
+
+
+# Response encoder: orjson when installed, stdlib json otherwise
+if orjson is not None:
+    _dumps = orjson.dumps
+else:
+    def _dumps(data) -> bytes:
+        return json.dumps(data).encode()
+
+
+# Bodies of the static endpoints, encoded once
+_HEALTH_BODY = _dumps({"status": "ok", "version": "1.0.0"})
+_STATUS_BODY = _dumps({
+    "status": "running",
+    "documents": 1000,
+    "collections": 5,
+    "uptime_seconds": 3600
+})
+_COLLECTIONS_BODY = _dumps({
+    "collections": [
+        {"name": "default", "document_count": 500},
+        {"name": "code", "document_count": 300},
+        {"name": "docs", "document_count": 200}
+    ]
+})
+_INDEXED_BODY = _dumps({"status": "indexed", "document_id": "doc-new-001"})
+_NOT_FOUND_BODY = _dumps({"error": "Not found"})
+
+# Static GET routes, looked up by path
+_GET_BODIES = {
+    '/health': _HEALTH_BODY,
+    '/api/v1/status': _STATUS_BODY,
+    '/api/v1/collections': _COLLECTIONS_BODY,
+}
 
 
 class MockOnelistHandler(BaseHTTPRequestHandler):
     """Handler for mock Onelist API requests."""
 
+    # Keep connections open between requests; every response sets Content-Length
+    protocol_version = 'HTTP/1.1'
+
     def log_message(self, format, *args):
         """Suppress default logging."""
         pass
 
     def _send_json(self, data, status=200):
         """Send JSON response."""
+        self._send_bytes(_dumps(data), status)
+
+    def _send_bytes(self, body, status=200):
+        """Send an already-encoded JSON response."""
         self.send_response(status)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(body)
+
+    def _route_path(self):
+        """Request path without query string; urlparse only when there is one."""
+        if '?' in self.path:
+            return urlparse(self.path).path
+        return self.path
 
     def do_GET(self):
         """Handle GET requests."""
-        parsed = urlparse(self.path)
-        path = parsed.path
-
-        if path == '/health':
-            self._send_json({"status": "ok", "version": "1.0.0"})
-        elif path == '/api/v1/status':
-            self._send_json({
-                "status": "running",
-                "documents": 1000,
-                "collections": 5,
-                "uptime_seconds": 3600
-            })
-        elif path == '/api/v1/collections':
-            self._send_json({
-                "collections": [
-                    {"name": "default", "document_count": 500},
-                    {"name": "code", "document_count": 300},
-                    {"name": "docs", "document_count": 200}
-                ]
-            })
+        body = _GET_BODIES.get(self._route_path())
+        if body is None:
+            self._send_bytes(_NOT_FOUND_BODY, 404)
         else:
-            self._send_json({"error": "Not found"}, 404)
+            self._send_bytes(body)
+
+    def _search(self, data):
+        """POST /api/v1/search"""
+        query = data.get('query', '')
+        self._send_json({
+            "query": query,
+            "results": [
+                {
+                    "id": "doc-001",
+                    "content": f"Mock result for: {query}",
+                    "score": 0.95,
+                    "metadata": {"source": "test"}
+                },
+                {
+                    "id": "doc-002",
+                    "content": f"Another result for: {query}",
+                    "score": 0.85,
+                    "metadata": {"source": "test"}
+                }
+            ],
+            "total": 2
+        })
+
+    def _index(self, data):
+        """POST /api/v1/index"""
+        self._send_bytes(_INDEXED_BODY)
+
+    _POST_ROUTES = {
+        '/api/v1/search': _search,
+        '/api/v1/index': _index,
+    }
 
     def do_POST(self):
         """Handle POST requests."""
-        parsed = urlparse(self.path)
-        path = parsed.path
+        handler = self._POST_ROUTES.get(self._route_path())
 
+        # Always drain the body so the kept-alive connection stays in sync
         content_length = int(self.headers.get('Content-Length', 0))
         body = self.rfile.read(content_length) if content_length else b''
 
+        if handler is None:
+            self._send_bytes(_NOT_FOUND_BODY, 404)
+            return
+
         try:
             data = json.loads(body) if body else {}
         except json.JSONDecodeError:
             data = {}
 
-        if path == '/api/v1/search':
-            query = data.get('query', '')
-            self._send_json({
-                "query": query,
-                "results": [
-                    {
-                        "id": "doc-001",
-                        "content": f"Mock result for: {query}",
-                        "score": 0.95,
-                        "metadata": {"source": "test"}
-                    },
-                    {
-                        "id": "doc-002",
-                        "content": f"Another result for: {query}",
-                        "score": 0.85,
-                        "metadata": {"source": "test"}
-                    }
-                ],
-                "total": 2
-            })
-        elif path == '/api/v1/index':
-            self._send_json({
-                "status": "indexed",
-                "document_id": "doc-new-001"
-            })
-        else:
-            self._send_json({"error": "Not found"}, 404)
+        handler(self, data)
 
 
 def main():
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
-    server = HTTPServer(('127.0.0.1', port), MockOnelistHandler)
+    # One thread per connection, so concurrent test clients aren't serialized
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockOnelistHandler)
+    server.daemon_threads = True
     print(f"Mock Onelist API running on http://127.0.0.1:{port}")
     try:
         server.serve_forever()
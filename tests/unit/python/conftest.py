@@ -4,31 +4,25 @@ Pytest configuration and fixtures for OCTO tests.
 
 import json
 import os
-import sys
-import tempfile
+import shutil
 from pathlib import Path
 
 import pytest
 
-# Add lib directories to path
-PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
-sys.path.insert(0, str(PROJECT_ROOT / "lib" / "core"))
-
 # Fixtures directory
 FIXTURES_DIR = Path(__file__).parent.parent.parent / "fixtures"
 
 
 @pytest.fixture
-def temp_dir():
+def temp_dir(tmp_path):
     """Create a temporary directory for tests."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield Path(tmpdir)
+    return tmp_path
 
 
-@pytest.fixture
-def mock_openclaw_home(temp_dir):
-    """Create a mock OpenClaw home directory."""
-    openclaw_home = temp_dir / "openclaw"
+@pytest.fixture(scope="session")
+def _openclaw_home_template(tmp_path_factory):
+    """Build the mock OpenClaw home once; tests get copies."""
+    openclaw_home = tmp_path_factory.mktemp("templates") / "openclaw"
     sessions_dir = openclaw_home / "agents" / "main" / "sessions"
     sessions_dir.mkdir(parents=True)
 
@@ -43,9 +37,39 @@ def mock_openclaw_home(temp_dir):
 
 
 @pytest.fixture
-def mock_octo_home(temp_dir):
-    """Create a mock OCTO home directory."""
-    octo_home = temp_dir / "octo"
+def mock_openclaw_home(temp_dir, _openclaw_home_template):
+    """Create a mock OpenClaw home directory."""
+    openclaw_home = temp_dir / "openclaw"
+    shutil.copytree(_openclaw_home_template, openclaw_home)
+    return openclaw_home
+
+
+@pytest.fixture
+def sessions_dir(mock_openclaw_home):
+    """The mock OpenClaw home's sessions directory."""
+    return mock_openclaw_home / "agents" / "main" / "sessions"
+
+
+@pytest.fixture
+def monitor(sessions_dir):
+    """Create SessionMonitor over the mock sessions directory."""
+    from session_monitor import SessionMonitor
+    return SessionMonitor(sessions_dir=sessions_dir)
+
+
+@pytest.fixture(scope="class")
+def class_monitor(tmp_path_factory, _openclaw_home_template):
+    """SessionMonitor over a mock sessions directory shared by one test class."""
+    from session_monitor import SessionMonitor
+    openclaw_home = tmp_path_factory.mktemp("class") / "openclaw"
+    shutil.copytree(_openclaw_home_template, openclaw_home)
+    return SessionMonitor(sessions_dir=openclaw_home / "agents" / "main" / "sessions")
+
+
+@pytest.fixture(scope="session")
+def _octo_home_template(tmp_path_factory):
+    """Build the mock OCTO home once; tests get copies."""
+    octo_home = tmp_path_factory.mktemp("templates") / "octo"
     octo_home.mkdir()
 
     # Create subdirectories
@@ -57,6 +81,14 @@ def mock_octo_home(temp_dir):
     return octo_home
 
 
+@pytest.fixture
+def mock_octo_home(temp_dir, _octo_home_template):
+    """Create a mock OCTO home directory."""
+    octo_home = temp_dir / "octo"
+    shutil.copytree(_octo_home_template, octo_home)
+    return octo_home
+
+
 @pytest.fixture
 def sample_config(mock_octo_home):
     """Create a sample OCTO config."""
@@ -81,11 +113,21 @@ def sample_config(mock_octo_home):
     return config_path
 
 
-@pytest.fixture
-def sample_session(mock_openclaw_home):
-    """Create a sample session file."""
-    sessions_dir = mock_openclaw_home / "agents" / "main" / "sessions"
-    session_file = sessions_dir / "test-session.jsonl"
+def _jsonl(records):
+    """Encode records as one JSONL blob, written with a single call."""
+    return b"".join(json.dumps(record).encode() + b"\n" for record in records)
+
+
+@pytest.fixture(scope="session")
+def _session_templates(tmp_path_factory):
+    """Directory holding the read-only session file templates."""
+    return tmp_path_factory.mktemp("sessions")
+
+
+@pytest.fixture(scope="session")
+def _sample_session_template(_session_templates):
+    """Write the sample session once."""
+    session_file = _session_templates / "test-session.jsonl"
 
     messages = [
         {"type": "message", "message": {"role": "user", "content": "Hello"}},
@@ -94,49 +136,44 @@ def sample_session(mock_openclaw_home):
         {"type": "message", "message": {"role": "assistant", "content": "I'm doing well, thanks!"}},
     ]
 
-    with open(session_file, "w") as f:
-        for msg in messages:
-            f.write(json.dumps(msg) + "\n")
-
+    session_file.write_bytes(_jsonl(messages))
     return session_file
 
 
 @pytest.fixture
-def bloated_session(mock_openclaw_home):
-    """Create a bloated session file with injection markers."""
-    sessions_dir = mock_openclaw_home / "agents" / "main" / "sessions"
-    session_file = sessions_dir / "bloated-session.jsonl"
+def sample_session(sessions_dir, _sample_session_template):
+    """Create a sample session file."""
+    return Path(shutil.copy(_sample_session_template, sessions_dir))
 
-    with open(session_file, "w") as f:
-        # Normal messages
-        for i in range(10):
-            f.write(json.dumps({
-                "type": "message",
-                "message": {"role": "user", "content": f"Message {i}"}
-            }) + "\n")
 
-        # Injection markers
-        for i in range(5):
-            f.write(json.dumps({
-                "type": "message",
-                "message": {
-                    "role": "user",
-                    "content": f"[INJECTION-DEPTH:1] Recovered Conversation Context {i}"
-                }
-            }) + "\n")
+@pytest.fixture(scope="session")
+def _bloated_session_template(_session_templates):
+    """Write the bloated session once."""
+    session_file = _session_templates / "bloated-session.jsonl"
 
+    contents = [
+        # Normal messages
+        *(f"Message {i}" for i in range(10)),
+        # Injection markers
+        *(f"[INJECTION-DEPTH:1] Recovered Conversation Context {i}" for i in range(5)),
         # Nested injection
-        f.write(json.dumps({
-            "type": "message",
-            "message": {
-                "role": "user",
-                "content": "[INJECTION-DEPTH:2] Recovered Conversation Context [INJECTION-DEPTH:1] Recovered Conversation Context"
-            }
-        }) + "\n")
+        "[INJECTION-DEPTH:2] Recovered Conversation Context [INJECTION-DEPTH:1] Recovered Conversation Context",
+    ]
+    messages = [
+        {"type": "message", "message": {"role": "user", "content": content}}
+        for content in contents
+    ]
 
+    session_file.write_bytes(_jsonl(messages))
     return session_file
 
 
+@pytest.fixture
+def bloated_session(sessions_dir, _bloated_session_template):
+    """Create a bloated session file with injection markers."""
+    return Path(shutil.copy(_bloated_session_template, sessions_dir))
+
+
 @pytest.fixture
 def sample_costs(mock_octo_home):
     """Create sample cost data."""
@@ -165,35 +202,32 @@ def sample_costs(mock_octo_home):
         },
     ]
 
-    with open(cost_file, "w") as f:
-        for cost in costs:
-            f.write(json.dumps(cost) + "\n")
-
+    cost_file.write_bytes(_jsonl(costs))
     return cost_file
 
 
-@pytest.fixture
-def pricing_file(temp_dir):
-    """Create a pricing configuration file."""
+@pytest.fixture(scope="session")
+def pricing_file(tmp_path_factory):
+    """Create a pricing configuration file (shared, read-only)."""
     pricing = {
         "models": {
             "claude-sonnet-4-20250514": {
-                "input_per_mtok": 3.0,
-                "output_per_mtok": 15.0,
-                "cache_read_per_mtok": 0.30,
-                "cache_write_per_mtok": 3.75
+                "input_per_million": 3.0,
+                "output_per_million": 15.0,
+                "cache_read_per_million": 0.30,
+                "cache_write_per_million": 3.75
             },
             "claude-haiku-3-5-20241022": {
-                "input_per_mtok": 1.0,
-                "output_per_mtok": 5.0,
-                "cache_read_per_mtok": 0.10,
-                "cache_write_per_mtok": 1.25
+                "input_per_million": 1.0,
+                "output_per_million": 5.0,
+                "cache_read_per_million": 0.10,
+                "cache_write_per_million": 1.25
             },
             "claude-opus-4-20250514": {
-                "input_per_mtok": 15.0,
-                "output_per_mtok": 75.0,
-                "cache_read_per_mtok": 1.50,
-                "cache_write_per_mtok": 18.75
+                "input_per_million": 15.0,
+                "output_per_million": 75.0,
+                "cache_read_per_million": 1.50,
+                "cache_write_per_million": 18.75
             }
         },
         "aliases": {
@@ -203,7 +237,7 @@ def pricing_file(temp_dir):
         }
     }
 
-    pricing_path = temp_dir / "model_pricing.json"
+    pricing_path = tmp_path_factory.mktemp("pricing") / "model_pricing.json"
     pricing_path.write_text(json.dumps(pricing, indent=2))
 
     return pricing_path
@@ -5,18 +5,14 @@ Tests for lib/core/cost_estimator.py
 
 import json
 import os
-import sys
 import tempfile
-from datetime import datetime
-from pathlib import Path
+import time
+from datetime import date, datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch, mock_open
 
 import pytest
 
-# Add lib/core to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "lib" / "core"))
-
-from cost_estimator import Cost, CostEstimator
+from cost_estimator import Cost, CostEstimator, RequestCost
 
 
 class TestCost:
@@ -63,10 +59,10 @@ class TestCostEstimatorPricing:
         pricing_data = {
             "models": {
                 "claude-sonnet-4-20250514": {
-                    "input_per_mtok": 3.0,
-                    "output_per_mtok": 15.0,
-                    "cache_read_per_mtok": 0.30,
-                    "cache_write_per_mtok": 3.75
+                    "input_per_million": 3.0,
+                    "output_per_million": 15.0,
+                    "cache_read_per_million": 0.30,
+                    "cache_write_per_million": 3.75
                 }
             }
         }
@@ -91,8 +87,10 @@ class TestCostEstimatorPricing:
         pricing_data = {
             "models": {
                 "claude-sonnet-4-20250514": {
-                    "input_per_mtok": 3.0,
-                    "output_per_mtok": 15.0
+                    "input_per_million": 3.0,
+                    "output_per_million": 15.0,
+                    "cache_read_per_million": 0.3,
+                    "cache_write_per_million": 3.75
                 }
             },
             "aliases": {
@@ -104,9 +102,12 @@ class TestCostEstimatorPricing:
 
         estimator = CostEstimator(pricing_path=str(pricing_file))
 
-        # Should resolve alias
-        resolved = estimator._resolve_model("sonnet")
-        assert resolved == "claude-sonnet-4-20250514"
+        usage = {"input_tokens": 1000, "output_tokens": 500}
+        via_alias = estimator.calculate({}, {"model": "sonnet", "usage": usage})
+        via_id = estimator.calculate({}, {"model": "claude-sonnet-4-20250514", "usage": usage})
+
+        # Should price the alias at its target's rates
+        assert via_alias.total == via_id.total == pytest.approx(0.0105)
 
 
 class TestCostEstimatorCalculation:
@@ -119,16 +120,16 @@ class TestCostEstimatorCalculation:
         pricing_data = {
             "models": {
                 "claude-sonnet-4-20250514": {
-                    "input_per_mtok": 3.0,
-                    "output_per_mtok": 15.0,
-                    "cache_read_per_mtok": 0.30,
-                    "cache_write_per_mtok": 3.75
+                    "input_per_million": 3.0,
+                    "output_per_million": 15.0,
+                    "cache_read_per_million": 0.30,
+                    "cache_write_per_million": 3.75
                 },
                 "claude-haiku-3-5-20241022": {
-                    "input_per_mtok": 1.0,
-                    "output_per_mtok": 5.0,
-                    "cache_read_per_mtok": 0.10,
-                    "cache_write_per_mtok": 1.25
+                    "input_per_million": 1.0,
+                    "output_per_million": 5.0,
+                    "cache_read_per_million": 0.10,
+                    "cache_write_per_million": 1.25
                 }
             }
         }
@@ -340,6 +341,7 @@ class TestCostEstimatorSummary:
         with open(cost_file, "w") as f:
             f.write(json.dumps({"total_cost": 0.05}) + "\n")
             f.write("invalid json line\n")
+            f.write("{corrupted line}\n")
             f.write(json.dumps({"total_cost": 0.03}) + "\n")
 
         estimator = CostEstimator(costs_dir=str(costs_dir))
@@ -407,3 +409,528 @@ class TestCostEstimatorSavings:
 
         assert savings["estimated_cost"] == 0.0
         assert savings["savings_amount"] == 0.0
+
+
+class TestDailySummaryScanner:
+    """Tests for the byte-level daily summary scanner."""
+
+    @pytest.fixture
+    def estimator(self, tmp_path, monkeypatch):
+        """Create estimator rooted in a temp OCTO home."""
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "OCTO_HOME", tmp_path)
+        return CostEstimator()
+
+    def test_sums_fields_and_skips_partial_lines(self, estimator):
+        """Sums numeric fields and ignores malformed or truncated lines."""
+        cost_file = estimator.costs_dir / f"{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+        cost_file.write_bytes(
+            b'{"model": "sonnet", "input_tokens": 100, "output_tokens": 10, "total": 0.5}\n'
+            b'not json\n'
+            b'{corrupted line}\n'
+            b'\n'
+            b'{"input_tokens":50,"cache_read_tokens":5,"total":1.5e-1,"session_id":"a"}\n'
+            b'{"input_tokens": 7, "tot'
+        )
+
+        summary = estimator.get_daily_summary()
+
+        assert summary["requests"] == 2
+        assert summary["total_cost"] == pytest.approx(0.65)
+        assert summary["input_tokens"] == 150
+        assert summary["output_tokens"] == 10
+        assert summary["cache_read_tokens"] == 5
+
+    def test_whole_buffer_scan_matches_line_scan(self):
+        """A log of complete records sums the same as the line-by-line fallback."""
+        records = b"".join(
+            json.dumps({"input_tokens": i, "output_tokens": 2 * i, "cache_read_tokens": i % 3,
+                        "total": i / 7, "session_id": None}).encode() + b"\n"
+            for i in range(50)
+        )
+        fast = {b"total": 0.0, b"input_tokens": 0, b"output_tokens": 0, b"cache_read_tokens": 0}
+        slow = dict(fast)
+
+        assert CostEstimator._scan_records(records, fast) == 50
+        assert CostEstimator._scan_records(records + b"\n", slow) == 50
+        assert fast == pytest.approx(slow)
+        assert isinstance(fast[b"input_tokens"], int)
+
+
+class TestCostLogWriter:
+    """Tests for the buffered daily log writer."""
+
+    @pytest.fixture
+    def estimator(self, tmp_path, monkeypatch):
+        """Create estimator rooted in a temp OCTO home."""
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "OCTO_HOME", tmp_path)
+        est = CostEstimator()
+        yield est
+        est.close()
+
+    @pytest.fixture
+    def request_cost(self, estimator):
+        """A calculated request cost to record."""
+        return estimator.calculate({}, {
+            "model": "claude-sonnet-4-20250514",
+            "usage": {"input_tokens": 1000, "output_tokens": 100},
+        })
+
+    def cost_file(self, estimator):
+        return estimator.costs_dir / f"{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+
+    def test_buffers_until_flush(self, estimator, request_cost, monkeypatch):
+        """Records are buffered and written on flush."""
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "BATCH_FLUSH_MS", 0)
+        estimator.record(request_cost, session_id="s1")
+        estimator.record(request_cost, session_id="s2")
+
+        assert self.cost_file(estimator).read_bytes() == b""
+
+        estimator.flush()
+        lines = self.cost_file(estimator).read_text().splitlines()
+        assert [json.loads(line)["session_id"] for line in lines] == ["s1", "s2"]
+
+    def test_flushes_when_batch_is_full(self, estimator, request_cost, monkeypatch):
+        """A full batch is written without waiting for the timer."""
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "BATCH_FLUSH_MS", 0)
+        monkeypatch.setattr(cost_estimator, "BATCH_SIZE", 3)
+
+        for _ in range(4):
+            estimator.record(request_cost)
+
+        assert len(self.cost_file(estimator).read_text().splitlines()) == 3
+
+    def wait_for_lines(self, estimator, count):
+        """Poll the daily log until it holds count lines, for up to a second."""
+        deadline = time.monotonic() + 1
+        while time.monotonic() < deadline:
+            if len(self.cost_file(estimator).read_text().splitlines()) >= count:
+                break
+            time.sleep(0.005)
+        return len(self.cost_file(estimator).read_text().splitlines())
+
+    def test_timer_flushes_partial_batch(self, estimator, request_cost, monkeypatch):
+        """A partial batch is written shortly after its first record."""
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "BATCH_FLUSH_MS", 10)
+
+        estimator.record(request_cost)
+
+        assert self.wait_for_lines(estimator, 1) == 1
+        assert not estimator._flush_scheduled
+
+    def test_timed_flushes_share_one_thread(self, estimator, request_cost, monkeypatch):
+        """Spaced-out records are flushed by one long-lived thread, not a thread each."""
+        import threading
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "BATCH_FLUSH_MS", 1)
+        estimator.record(request_cost)
+        self.wait_for_lines(estimator, 1)
+        threads = threading.active_count()
+
+        for i in range(2, 12):
+            estimator.record(request_cost)
+            assert self.wait_for_lines(estimator, i) == i
+
+        assert threading.active_count() == threads
+
+    def test_durable_record_is_written_immediately(self, estimator, request_cost):
+        """durable=True bypasses the buffer."""
+        estimator.record(request_cost, session_id="s1", durable=True)
+
+        assert len(self.cost_file(estimator).read_text().splitlines()) == 1
+
+    def test_formats_timestamp_on_record(self, estimator, request_cost):
+        """Epoch timestamp is written as an ISO-8601 UTC string."""
+        assert isinstance(request_cost.timestamp, float)
+
+        estimator.record(request_cost, durable=True)
+
+        data = json.loads(self.cost_file(estimator).read_text())
+        parsed = datetime.strptime(data["timestamp"], "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+        assert parsed.timestamp() == pytest.approx(request_cost.timestamp, abs=1e-3)
+
+    def test_timestamp_format_matches_datetime(self):
+        """Cached-prefix formatting agrees with datetime, across second boundaries."""
+        from cost_estimator import _format_timestamp
+
+        base = 1767225599.0  # 2025-12-31T23:59:59Z
+        for ts in (base, base + 0.5, base + 0.9999996, base + 1.001, base + 0.25, base + 86400.123):
+            expected = datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(timespec="milliseconds")
+            assert _format_timestamp(ts) == expected.replace("+00:00", "Z")
+
+    def test_summary_includes_buffered_records(self, estimator, request_cost):
+        """Summary sees records still sitting in the write buffer."""
+        estimator.record(request_cost)
+        estimator.record(request_cost)
+
+        summary = estimator.get_daily_summary()
+
+        assert summary["requests"] == 2
+        assert summary["total_cost"] == pytest.approx(2 * request_cost.total)
+
+    def test_concurrent_estimators_write_whole_lines(self, estimator, request_cost, monkeypatch):
+        """Batches from several estimators and threads never split a line."""
+        import threading
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "BATCH_SIZE", 7)
+        others = [CostEstimator() for _ in range(2)]
+
+        def worker(est):
+            for _ in range(100):
+                est.record(request_cost)
+
+        threads = [threading.Thread(target=worker, args=(est,)) for est in [estimator, estimator] + others]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for est in [estimator] + others:
+            est.close()
+
+        lines = self.cost_file(estimator).read_bytes().splitlines()
+        assert len(lines) == 400
+        assert all(json.loads(line)["model"] == request_cost.model for line in lines)
+
+    def test_dropped_estimator_flushes_and_closes(self, estimator, request_cost, monkeypatch):
+        """An estimator that is never closed is freed once dropped, writing out its buffer."""
+        import weakref
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "BATCH_FLUSH_MS", 0)
+        other = CostEstimator()
+        other.record(request_cost, session_id="dropped")
+        fd = other._write_fd
+        ref = weakref.ref(other)
+
+        del other
+
+        assert ref() is None
+        assert json.loads(self.cost_file(estimator).read_text())["session_id"] == "dropped"
+        with pytest.raises(OSError):
+            os.fstat(fd)
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+    def test_forked_child_does_not_rewrite_parent_buffer(self, estimator, request_cost, monkeypatch):
+        """Records buffered before a fork are written once, by the parent."""
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "BATCH_FLUSH_MS", 10)
+        estimator.record(request_cost, session_id="parent")
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                time.sleep(0.05)  # past the parent's flush deadline
+                estimator.close()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        estimator.close()
+
+        lines = self.cost_file(estimator).read_text().splitlines()
+        assert [json.loads(line)["session_id"] for line in lines] == ["parent"]
+
+    def test_context_manager_closes_writer(self, estimator, request_cost):
+        """Leaving a with block flushes and closes the daily log."""
+        with CostEstimator() as other:
+            other.record(request_cost)
+
+        assert other._write_fd is None
+        assert len(self.cost_file(estimator).read_text().splitlines()) == 1
+
+    def test_reopens_log_only_after_midnight(self, estimator, request_cost, monkeypatch):
+        """The day's log handle is reused until the local day ends."""
+        import cost_estimator
+        opened = []
+        open_writer = estimator._open_writer
+        monkeypatch.setattr(estimator, "_open_writer", lambda day: opened.append(day) or open_writer(day))
+
+        estimator.record(request_cost)
+        estimator.record(request_cost)
+        assert len(opened) == 1
+
+        monkeypatch.setattr(cost_estimator.time, "time", lambda: estimator._write_until)
+        estimator.record(request_cost)
+        assert len(opened) == 2
+
+    def test_daily_paths_reused_within_a_day(self, estimator):
+        """The log and sidecar paths are built once per day."""
+        today = date.today()
+        paths = estimator._daily_paths(today)
+
+        assert estimator._daily_paths(today) is paths
+        assert paths[0].name == f"{today.isoformat()}.jsonl"
+        assert paths[1].name == f"{today.isoformat()}.summary.json"
+        assert estimator._daily_paths(today - timedelta(days=1))[0].name != paths[0].name
+
+
+class TestPricingTable:
+    """Tests for the flattened pricing lookup."""
+
+    @pytest.fixture
+    def estimator(self, tmp_path, monkeypatch):
+        """Create estimator with the bundled pricing file."""
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "OCTO_HOME", tmp_path)
+        return CostEstimator()
+
+    def cost_for(self, estimator, model):
+        return estimator.calculate({}, {
+            "model": model,
+            "usage": {"input_tokens": 1_000_000, "output_tokens": 1_000_000},
+        }).total
+
+    def test_alias_priced_like_target(self, estimator):
+        """Aliases resolve to their target model's rates."""
+        assert self.cost_for(estimator, "haiku") == pytest.approx(
+            self.cost_for(estimator, "claude-haiku-3-5-20241022")
+        )
+        assert self.cost_for(estimator, "opus") > self.cost_for(estimator, "sonnet")
+
+    def test_unknown_model_uses_sonnet_rates(self, estimator):
+        """Unknown models fall back to Sonnet pricing."""
+        assert self.cost_for(estimator, "unknown-model") == pytest.approx(18.0)
+
+    def test_model_missing_a_rate_is_an_error(self, tmp_path):
+        """A misnamed rate field fails loudly instead of pricing at the default."""
+        pricing = {"models": {"m": {"input_per_mtok": 3.0, "output_per_million": 15.0,
+                                    "cache_read_per_million": 0.3, "cache_write_per_million": 3.75}}}
+        estimator = CostEstimator(pricing=pricing, costs_dir=tmp_path)
+
+        with pytest.raises(ValueError, match="'m' is missing input_per_million"):
+            estimator.calculate({}, {"model": "m", "usage": {"input_tokens": 1}})
+
+    def test_repeated_usage_reuses_cost(self, estimator):
+        """Identical model and token counts share one memoized Cost."""
+        response = {"model": "sonnet", "usage": {"input_tokens": 1200, "output_tokens": 300}}
+
+        first = estimator.calculate({}, response)
+        second = estimator.calculate({}, response)
+
+        assert first is not second
+        assert first.cost is second.cost
+        assert estimator.calculate({}, {**response, "model": "opus"}).cost is not first.cost
+
+    def test_batch_matches_calculate(self, estimator):
+        """calculate_batch prices each usage like calculate does."""
+        usages = [
+            {"input_tokens": 1200, "output_tokens": 300},
+            {"input_tokens": 5000, "cache_read_input_tokens": 4000, "cache_creation_input_tokens": 100},
+            {},
+        ]
+
+        costs = estimator.calculate_batch("opus", usages)
+
+        assert costs == [
+            estimator.calculate({}, {"model": "opus", "usage": usage}).cost for usage in usages
+        ]
+
+    def test_pricing_loaded_on_first_calculate(self, estimator):
+        """Recording pre-costed requests never reads the pricing file."""
+        estimator.record(RequestCost(
+            timestamp=datetime.now().timestamp(),
+            model="sonnet",
+            input_tokens=10,
+            output_tokens=5,
+            cache_read_tokens=0,
+            cache_write_tokens=0,
+            cost=Cost(input_cost=0.1, output_cost=0.2, cache_read_cost=0.0, cache_write_cost=0.0),
+        ))
+        estimator.get_daily_summary()
+        assert "pricing" not in vars(estimator)
+
+        self.cost_for(estimator, "sonnet")
+        assert "pricing" in vars(estimator)
+
+    def test_custom_pricing_path(self, tmp_path):
+        """pricing_path overrides the bundled pricing file."""
+        pricing_file = tmp_path / "pricing.json"
+        pricing_file.write_text(json.dumps({"models": {"sonnet": {
+            "input_per_million": 1.0, "output_per_million": 2.0,
+            "cache_read_per_million": 0.0, "cache_write_per_million": 0.0,
+        }}}))
+
+        estimator = CostEstimator(pricing_path=pricing_file)
+
+        assert self.cost_for(estimator, "sonnet") == pytest.approx(3.0)
+
+    def test_preparsed_pricing_skips_file(self, tmp_path):
+        """A pricing dict passed in is used as-is; the file is never read."""
+        pricing = {"models": {"sonnet": {
+            "input_per_million": 2.0, "output_per_million": 4.0,
+            "cache_read_per_million": 0.0, "cache_write_per_million": 0.0,
+        }}}
+
+        estimator = CostEstimator(
+            pricing_path=tmp_path / "missing.json", pricing=pricing, costs_dir=tmp_path / "costs"
+        )
+
+        assert estimator.pricing is pricing
+        assert self.cost_for(estimator, "sonnet") == pytest.approx(6.0)
+        assert (tmp_path / "costs").is_dir()
+
+    def test_pricing_file_parsed_once_until_changed(self, tmp_path):
+        """Estimators reuse the parsed pricing file until it is rewritten."""
+        pricing_file = tmp_path / "pricing.json"
+        pricing_file.write_text(json.dumps({"models": {}, "aliases": {"a": "b"}}))
+
+        first = CostEstimator(pricing_path=pricing_file, costs_dir=tmp_path)
+        assert first.pricing["aliases"] == {"a": "b"}
+        second = CostEstimator(pricing_path=pricing_file, costs_dir=tmp_path)
+        with patch("builtins.open", side_effect=AssertionError("re-read")):
+            assert second.pricing == first.pricing
+
+        # Each estimator has its own copy
+        first.pricing["aliases"]["a"] = "x"
+        assert second.pricing["aliases"] == {"a": "b"}
+        assert CostEstimator(pricing_path=pricing_file, costs_dir=tmp_path).pricing["aliases"] == {"a": "b"}
+
+        pricing_file.write_text(json.dumps({"models": {}, "aliases": {"a": "c"}}))
+        os.utime(pricing_file, ns=(0, 0))
+        third = CostEstimator(pricing_path=pricing_file, costs_dir=tmp_path)
+        assert third.pricing["aliases"] == {"a": "c"}
+
+
+class TestSummarySidecar:
+    """Tests for the running-total sidecar behind get_daily_summary."""
+
+    @pytest.fixture
+    def estimator(self, tmp_path, monkeypatch):
+        """Create estimator rooted in a temp OCTO home."""
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "OCTO_HOME", tmp_path)
+        return CostEstimator()
+
+    @staticmethod
+    def line(total, tokens=10):
+        return json.dumps({"input_tokens": tokens, "output_tokens": 1, "total": total}).encode() + b"\n"
+
+    def files(self, estimator):
+        day = datetime.now().strftime("%Y-%m-%d")
+        return estimator.costs_dir / f"{day}.jsonl", estimator.costs_dir / f"{day}.summary.json"
+
+    def test_sidecar_tracks_scanned_offset(self, estimator):
+        """The sidecar stores totals up to the end of the scanned log."""
+        cost_file, summary_file = self.files(estimator)
+        cost_file.write_bytes(self.line(0.25) * 2)
+
+        summary = estimator.get_daily_summary()
+
+        state = json.loads(summary_file.read_text())
+        assert state["offset"] == cost_file.stat().st_size
+        assert state["requests"] == summary["requests"] == 2
+        assert state["total"] == summary["total_cost"] == pytest.approx(0.5)
+
+    def test_only_appended_records_are_scanned(self, estimator):
+        """Records before the stored offset are taken from the sidecar."""
+        cost_file, summary_file = self.files(estimator)
+        cost_file.write_bytes(self.line(0.25))
+        estimator.get_daily_summary()
+
+        # Tamper with the stored total to prove the old record isn't re-read
+        state = json.loads(summary_file.read_text())
+        state["total"] = 100.0
+        summary_file.write_text(json.dumps(state))
+        with open(cost_file, "ab") as f:
+            f.write(self.line(0.5))
+
+        summary = estimator.get_daily_summary()
+
+        assert summary["requests"] == 2
+        assert summary["total_cost"] == pytest.approx(100.5)
+
+    def test_trailing_partial_record_is_not_persisted(self, estimator):
+        """A record without its newline counts now but stays outside the sidecar."""
+        cost_file, summary_file = self.files(estimator)
+        cost_file.write_bytes(self.line(0.25) + self.line(0.5).rstrip(b"\n"))
+
+        assert estimator.get_daily_summary()["requests"] == 2
+        assert json.loads(summary_file.read_text())["requests"] == 1
+
+        with open(cost_file, "ab") as f:
+            f.write(b"\n")
+
+        assert estimator.get_daily_summary()["total_cost"] == pytest.approx(0.75)
+
+    def test_truncated_log_and_bad_sidecar_are_rebuilt(self, estimator):
+        """A log smaller than the stored offset, or a corrupt sidecar, triggers a full rescan."""
+        cost_file, summary_file = self.files(estimator)
+        cost_file.write_bytes(self.line(0.25) * 3)
+        estimator.get_daily_summary()
+
+        cost_file.write_bytes(self.line(0.5))
+        assert estimator.get_daily_summary()["total_cost"] == pytest.approx(0.5)
+
+        summary_file.write_text("{not json")
+        assert estimator.get_daily_summary()["requests"] == 1
+
+    def test_recreated_log_is_rescanned(self, estimator):
+        """A log rewritten in place, even to a larger size, isn't added to the old totals."""
+        cost_file, _ = self.files(estimator)
+        cost_file.write_bytes(self.line(1.0) * 3)
+        estimator.get_daily_summary()
+
+        cost_file.write_bytes(self.line(0.01) * 5)
+
+        summary = estimator.get_daily_summary()
+        assert summary["requests"] == 5
+        assert summary["total_cost"] == pytest.approx(0.05)
+
+    def test_replaced_log_is_rescanned(self, estimator, tmp_path, monkeypatch):
+        """A log swapped for a different file is rescanned even when the checksummed head matches."""
+        import cost_estimator
+        monkeypatch.setattr(cost_estimator, "SUMMARY_HEAD_BYTES", 5)
+        cost_file, _ = self.files(estimator)
+        cost_file.write_bytes(self.line(0.25))
+        estimator.get_daily_summary()
+
+        replacement = tmp_path / "replacement.jsonl"
+        replacement.write_bytes(self.line(0.5) * 2)
+        cost_file.unlink()
+        os.replace(replacement, cost_file)
+
+        summary = estimator.get_daily_summary()
+        assert summary["requests"] == 2
+        assert summary["total_cost"] == pytest.approx(1.0)
+
+    def test_sidecar_removed_with_log(self, estimator):
+        """Once the day's log is gone, its sidecar is deleted too."""
+        cost_file, summary_file = self.files(estimator)
+        cost_file.write_bytes(self.line(0.25))
+        estimator.get_daily_summary()
+        assert summary_file.exists()
+
+        cost_file.unlink()
+
+        assert estimator.get_daily_summary()["requests"] == 0
+        assert not summary_file.exists()
+
+    def test_chunked_read_matches_single_read(self, estimator, monkeypatch):
+        """Records split across read chunks are counted exactly once."""
+        import cost_estimator
+        cost_file, summary_file = self.files(estimator)
+        cost_file.write_bytes(b"".join(self.line(i / 10, tokens=i) for i in range(40)))
+        whole = estimator.get_daily_summary()
+
+        summary_file.unlink()
+        monkeypatch.setattr(cost_estimator, "READ_CHUNK_SIZE", 17)
+        chunked = estimator.get_daily_summary()
+
+        assert chunked == pytest.approx(whole)
+        assert chunked["requests"] == 40
+        assert chunked["input_tokens"] == sum(range(40))
+
+    def test_record_without_total_is_repriced(self, estimator):
+        """Records missing the stored total are priced from their token counts."""
+        cost_file, _ = self.files(estimator)
+        legacy = json.dumps({"model": "claude-sonnet-4-20250514", "input_tokens": 1_000_000,
+                             "output_tokens": 0}).encode() + b"\n"
+        cost_file.write_bytes(self.line(0.25) + legacy)
+
+        summary = estimator.get_daily_summary()
+
+        assert summary["requests"] == 2
+        assert summary["total_cost"] == pytest.approx(3.25)
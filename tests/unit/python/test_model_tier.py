@@ -4,15 +4,12 @@ Tests for lib/core/model_tier.py
 """
 
 import json
-import sys
-from pathlib import Path
+import os
+import re
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-# Add lib/core to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "lib" / "core"))
-
 from model_tier import TierDecision, ModelTier
 
 
@@ -320,3 +317,113 @@ class TestModelTierModelMapping:
 
         if decision.tier == "opus":
             assert "opus" in decision.recommended_model.lower()
+
+
+class TestModelTierFusedPatterns:
+    """Tests for per-tier fused pattern matching."""
+
+    @pytest.fixture
+    def tier(self, tmp_path, monkeypatch):
+        """Create ModelTier with default patterns and no user config."""
+        import model_tier
+        monkeypatch.setattr(model_tier, "OCTO_HOME", tmp_path)
+        return ModelTier()
+
+    def test_fused_and_per_pattern_results_agree(self, tier):
+        """Fused matching picks the same tier as the per-pattern scan."""
+        messages = [
+            "What files are here?",
+            "Refactor and write tests for the function",
+            "Design the payment system and compare each approach",
+            "Tell me something interesting",
+        ]
+
+        for message in messages:
+            fused = tier.classify(message)
+            tier._haiku_fused = tier._opus_fused = tier._sonnet_fused = None
+            unfused = tier.classify(message)
+            tier._compile_patterns()
+
+            assert fused.recommended_model == unfused.recommended_model
+            assert fused.confidence == unfused.confidence
+            assert len(fused.patterns_matched) == len(unfused.patterns_matched)
+
+    def test_stops_at_first_match(self, tier):
+        """Only the first matching pattern is reported by default."""
+        decision = tier.classify("Refactor and write tests for the function")
+
+        assert len(decision.patterns_matched) == 1
+        tier_name, pattern = decision.patterns_matched[0].split(":", 1)
+        assert re.search(pattern, "Refactor and write tests for the function", re.IGNORECASE)
+
+    def test_collect_all_matches(self, tmp_path):
+        """collectAllMatches reports every matching pattern in the tier."""
+        config_file = tmp_path / "tier_config.json"
+        config_file.write_text(json.dumps({"collectAllMatches": True}))
+
+        decision = ModelTier(config_path=config_file).classify("Refactor and write tests for the function")
+
+        assert len(decision.patterns_matched) == 2
+
+    def test_backreference_patterns_are_not_fused(self, tmp_path):
+        """Patterns with numbered backreferences fall back to per-pattern matching."""
+        config_file = tmp_path / "tier_config.json"
+        config_file.write_text(json.dumps({"haikuPatterns": ["^(\\w+) \\1$", "^ok$"]}))
+
+        tier = ModelTier(config_path=config_file)
+
+        assert tier._haiku_fused is None
+        assert tier.classify("again again").recommended_model == "haiku"
+        assert tier.classify("again later").recommended_model != "haiku"
+
+    def test_default_patterns_compiled_once(self, tier):
+        """Instances on the default config share the precompiled patterns."""
+        other = ModelTier()
+
+        assert other.haiku_patterns is tier.haiku_patterns
+        assert other._sonnet_fused is tier._sonnet_fused
+
+    def test_custom_patterns_compiled_per_instance(self, tier, tmp_path):
+        """Only the tiers given in config get their own compiled patterns."""
+        config_file = tmp_path / "tier_config.json"
+        config_file.write_text(json.dumps({"opusPatterns": ["\\bmigrate\\b"]}))
+
+        custom = ModelTier(config_path=config_file)
+
+        assert custom.opus_patterns is not tier.opus_patterns
+        assert custom.haiku_patterns is tier.haiku_patterns
+        assert custom.classify("Migrate the database").recommended_model == "opus"
+
+    def test_scans_only_leading_characters(self, tier, tmp_path):
+        """Keywords past maxClassifyChars don't affect the tier; 0 lifts the cap."""
+        message = "Tell me a story. " + " " * 600 + "Design the billing system"
+        config_file = tmp_path / "tier_config.json"
+        config_file.write_text(json.dumps({"maxClassifyChars": 0}))
+
+        assert tier.classify(message).recommended_model == "sonnet"
+        assert ModelTier(config_path=config_file).classify(message).recommended_model == "opus"
+
+    def test_config_file_parsed_once_until_changed(self, tmp_path):
+        """Instances reuse the parsed config file until it is rewritten."""
+        config_file = tmp_path / "tier_config.json"
+        config_file.write_text(json.dumps({"defaultModel": "opus"}))
+        first = ModelTier(config_path=config_file)
+
+        with patch("builtins.open", side_effect=AssertionError("re-read")):
+            second = ModelTier(config_path=config_file)
+
+        assert second.config == first.config == {"defaultModel": "opus"}
+
+        config_file.write_text(json.dumps({"defaultModel": "haiku"}))
+        os.utime(config_file, ns=(0, 0))
+
+        assert ModelTier(config_path=config_file).config == {"defaultModel": "haiku"}
+
+    def test_cached_config_is_not_shared(self, tmp_path):
+        """Mutating one instance's config leaves other instances alone."""
+        config_file = tmp_path / "tier_config.json"
+        config_file.write_text(json.dumps({"haikuPatterns": ["hi"]}))
+
+        ModelTier(config_path=config_file).config["haikuPatterns"].append("bye")
+
+        assert ModelTier(config_path=config_file).config == {"haikuPatterns": ["hi"]}
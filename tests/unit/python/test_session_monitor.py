@@ -5,17 +5,43 @@ Tests for lib/core/session_monitor.py
 
 import json
 import os
-import sys
 import time
-from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-# Add lib/core to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "lib" / "core"))
+from session_monitor import SessionHealth, SessionMonitor, _scan_session_bytes
 
-from session_monitor import SessionHealth, SessionMonitor
+
+# A message line as json.dumps writes it; % (role, content) fills it in.
+# Only for plain ASCII content that needs no escaping.
+_MESSAGE_TMPL = '{"type": "message", "message": {"role": "%s", "content": "%s"}}\n'
+
+# A user message holding one injection block; % i numbers it
+_INJECTION_MSG_TMPL = _MESSAGE_TMPL % ("user", "[INJECTION-DEPTH:1] Recovered Conversation Context %d")
+
+
+def _alternating_messages(n, prefix):
+    """n messages alternating user/assistant, with content '<prefix> <i>'."""
+    return "".join(
+        _MESSAGE_TMPL % ("user" if i % 2 == 0 else "assistant", f"{prefix} {i}")
+        for i in range(n)
+    )
+
+
+def _make_sized_file(path, n):
+    """Create an n-byte file of zeros; sparse where supported, so nothing is written."""
+    with open(path, "wb") as f:
+        f.truncate(n)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time source for the session monitor; advance clock[0] to move time."""
+    import session_monitor
+    now = [1_000_000.0]
+    monkeypatch.setattr(session_monitor.time, "time", lambda: now[0])
+    return now
 
 
 class TestSessionHealth:
@@ -42,105 +68,70 @@ class TestSessionHealth:
         assert health.status == "healthy"
 
 
+@pytest.fixture(scope="class")
+def health(class_monitor):
+    """Analyze a sample session once per class; analyze_session is pure for a given file."""
+    session_file = class_monitor.sessions_dir / "test-session.jsonl"
+
+    session_file.write_text(_alternating_messages(10, "Message"))
+
+    return class_monitor.analyze_session(session_file)
+
+
 class TestSessionMonitorAnalysis:
     """Tests for session analysis."""
 
-    @pytest.fixture
-    def monitor(self, tmp_path):
-        """Create SessionMonitor with temp OpenClaw home."""
-        openclaw_home = tmp_path / "openclaw"
-        sessions_dir = openclaw_home / "agents" / "main" / "sessions"
-        sessions_dir.mkdir(parents=True)
-        return SessionMonitor(openclaw_home=str(openclaw_home))
-
-    @pytest.fixture
-    def sample_session(self, tmp_path):
-        """Create a sample session file."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
-        sessions_dir.mkdir(parents=True)
-        session_file = sessions_dir / "test-session.jsonl"
-
-        with open(session_file, "w") as f:
-            for i in range(10):
-                f.write(json.dumps({
-                    "type": "message",
-                    "message": {
-                        "role": "user" if i % 2 == 0 else "assistant",
-                        "content": f"Message {i}"
-                    }
-                }) + "\n")
-
-        return session_file
-
-    def test_calculates_file_size(self, monitor, sample_session):
+    def test_calculates_file_size(self, health):
         """Calculates file size correctly."""
-        health = monitor.analyze_session(str(sample_session))
-
-        assert health.size_bytes > 0
-        assert health.size_bytes == os.path.getsize(sample_session)
+        assert health.file_size_bytes > 0
+        assert health.file_size_bytes == os.path.getsize(health.file_path)
 
-    def test_estimates_tokens(self, monitor, sample_session):
+    def test_estimates_tokens(self, health):
         """Estimates tokens from file size."""
-        health = monitor.analyze_session(str(sample_session))
-
         # Roughly 4 bytes per token
-        expected = health.size_bytes // 4
+        expected = health.file_size_bytes // 4
         assert abs(health.estimated_tokens - expected) < 100
 
-    def test_counts_messages(self, monitor, sample_session):
+    def test_counts_messages(self, health):
         """Counts messages in session."""
-        health = monitor.analyze_session(str(sample_session))
-
         assert health.message_count == 10
 
-    def test_counts_injection_markers(self, tmp_path, monitor):
+    def test_counts_injection_markers(self, sessions_dir, monitor):
         """Counts injection markers in session."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
         session_file = sessions_dir / "injection-session.jsonl"
 
-        with open(session_file, "w") as f:
-            f.write(json.dumps({
-                "type": "message",
-                "message": {
-                    "role": "user",
-                    "content": "[INJECTION-DEPTH:1] Recovered Conversation Context"
-                }
-            }) + "\n")
-            f.write(json.dumps({
-                "type": "message",
-                "message": {
-                    "role": "user",
-                    "content": "[INJECTION-DEPTH:1] Recovered Conversation Context"
-                }
-            }) + "\n")
+        line = json.dumps({
+            "type": "message",
+            "message": {
+                "role": "user",
+                "content": "[INJECTION-DEPTH:1] Recovered Conversation Context"
+            }
+        }) + "\n"
+        session_file.write_text(line * 2)
 
         health = monitor.analyze_session(str(session_file))
 
         assert health.injection_markers == 2
 
-    def test_finds_max_nested_injections(self, tmp_path, monitor):
+    def test_finds_max_nested_injections(self, sessions_dir, monitor):
         """Finds maximum nested injections in single message."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
         session_file = sessions_dir / "nested-session.jsonl"
 
-        with open(session_file, "w") as f:
-            # Message with 2 nested blocks
-            f.write(json.dumps({
-                "type": "message",
-                "message": {
-                    "role": "user",
-                    "content": "[INJECTION-DEPTH:2] Recovered Conversation Context [INJECTION-DEPTH:1] Recovered Conversation Context"
-                }
-            }) + "\n")
+        # Message with 2 nested blocks
+        session_file.write_text(json.dumps({
+            "type": "message",
+            "message": {
+                "role": "user",
+                "content": "[INJECTION-DEPTH:2] Recovered Conversation Context [INJECTION-DEPTH:1] Recovered Conversation Context"
+            }
+        }) + "\n")
 
         health = monitor.analyze_session(str(session_file))
 
         assert health.max_nested_injections >= 2
 
-    def test_calculates_context_utilization(self, monitor, sample_session):
+    def test_calculates_context_utilization(self, health):
         """Calculates context utilization percentage."""
-        health = monitor.analyze_session(str(sample_session))
-
         # Should be between 0 and 1
         assert 0 <= health.context_utilization <= 1
 
@@ -148,158 +139,89 @@ class TestSessionMonitorAnalysis:
 class TestSessionMonitorStatus:
     """Tests for status determination."""
 
-    @pytest.fixture
-    def monitor(self, tmp_path):
-        """Create SessionMonitor."""
-        openclaw_home = tmp_path / "openclaw"
-        sessions_dir = openclaw_home / "agents" / "main" / "sessions"
-        sessions_dir.mkdir(parents=True)
-        return SessionMonitor(openclaw_home=str(openclaw_home))
-
-    def test_critical_for_nested_injections(self, tmp_path, monitor):
-        """Critical status for nested injection blocks."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
-        session_file = sessions_dir / "nested.jsonl"
-
-        with open(session_file, "w") as f:
-            f.write(json.dumps({
-                "type": "message",
-                "message": {
-                    "role": "user",
-                    "content": "[INJECTION-DEPTH:2] Recovered Conversation Context [INJECTION-DEPTH:1] Recovered Conversation Context"
-                }
-            }) + "\n")
-
-        health = monitor.analyze_session(str(session_file))
-
-        assert health.status == "critical"
-
-    def test_critical_for_size_over_10mb(self, tmp_path, monitor):
+    @pytest.mark.parametrize("content,expected", [
+        pytest.param(
+            # Blocks within 200 characters of each other count as one, so pad them apart
+            _MESSAGE_TMPL % ("user", "[INJECTION-DEPTH:2] Recovered Conversation Context " + "x" * 250
+                             + " [INJECTION-DEPTH:1] Recovered Conversation Context"),
+            "CRITICAL",
+            id="critical_for_nested_injections",
+        ),
+        pytest.param(
+            "".join(_INJECTION_MSG_TMPL % i for i in range(SessionMonitor.INJECTION_CRITICAL + 1)),
+            "CRITICAL",
+            id="critical_for_high_injection_count",
+        ),
+        pytest.param(
+            "".join(_INJECTION_MSG_TMPL % i for i in range(SessionMonitor.INJECTION_WARNING + 1)),
+            "WARNING",
+            id="warning_for_moderate_injections",
+        ),
+        pytest.param(
+            _alternating_messages(5, "Normal message"),
+            "HEALTHY",
+            id="healthy_for_normal_session",
+        ),
+    ])
+    def test_status_for_content(self, sessions_dir, monitor, content, expected):
+        """Status follows the injection blocks in the session."""
+        session_file = sessions_dir / "session.jsonl"
+
+        session_file.write_text(content)
+
+        health = monitor.analyze_session(session_file)
+
+        assert health.status == expected
+
+    def test_critical_for_size_over_10mb(self, sessions_dir, monitor):
         """Critical status for sessions over 10MB."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
         session_file = sessions_dir / "large.jsonl"
 
         # Create 11MB file
-        with open(session_file, "w") as f:
-            data = "x" * (11 * 1024 * 1024)
-            f.write(data)
+        _make_sized_file(session_file, 11 * 1024 * 1024)
 
         health = monitor.analyze_session(str(session_file))
 
         assert health.status == "critical"
 
-    def test_critical_for_high_injection_count(self, tmp_path, monitor):
-        """Critical status for high injection marker count."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
-        session_file = sessions_dir / "many-markers.jsonl"
-
-        with open(session_file, "w") as f:
-            for i in range(15):
-                f.write(json.dumps({
-                    "type": "message",
-                    "message": {
-                        "role": "user",
-                        "content": f"[INJECTION-DEPTH:1] Recovered Conversation Context {i}"
-                    }
-                }) + "\n")
-
-        health = monitor.analyze_session(str(session_file))
-
-        assert health.status == "critical"
-
-    def test_warning_for_size_over_2mb(self, tmp_path, monitor):
+    def test_warning_for_size_over_2mb(self, sessions_dir, monitor):
         """Warning status for sessions over 2MB."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
         session_file = sessions_dir / "medium.jsonl"
 
         # Create 3MB file
-        with open(session_file, "w") as f:
-            data = "x" * (3 * 1024 * 1024)
-            f.write(data)
+        _make_sized_file(session_file, 3 * 1024 * 1024)
 
         health = monitor.analyze_session(str(session_file))
 
         assert health.status in ["warning", "critical"]
 
-    def test_warning_for_moderate_injections(self, tmp_path, monitor):
-        """Warning status for moderate injection count."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
-        session_file = sessions_dir / "some-markers.jsonl"
-
-        with open(session_file, "w") as f:
-            for i in range(5):
-                f.write(json.dumps({
-                    "type": "message",
-                    "message": {
-                        "role": "user",
-                        "content": f"[INJECTION-DEPTH:1] Recovered Conversation Context {i}"
-                    }
-                }) + "\n")
-
-        health = monitor.analyze_session(str(session_file))
-
-        assert health.status in ["warning", "healthy"]
-
-    def test_healthy_for_normal_session(self, tmp_path, monitor):
-        """Healthy status for normal session."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
-        session_file = sessions_dir / "normal.jsonl"
-
-        with open(session_file, "w") as f:
-            for i in range(5):
-                f.write(json.dumps({
-                    "type": "message",
-                    "message": {
-                        "role": "user" if i % 2 == 0 else "assistant",
-                        "content": f"Normal message {i}"
-                    }
-                }) + "\n")
-
-        health = monitor.analyze_session(str(session_file))
-
-        assert health.status == "healthy"
-
 
 class TestSessionMonitorGrowthRate:
     """Tests for growth rate calculation."""
 
-    @pytest.fixture
-    def monitor(self, tmp_path):
-        """Create SessionMonitor."""
-        openclaw_home = tmp_path / "openclaw"
-        sessions_dir = openclaw_home / "agents" / "main" / "sessions"
-        sessions_dir.mkdir(parents=True)
-        return SessionMonitor(openclaw_home=str(openclaw_home))
-
-    def test_calculates_growth_rate(self, tmp_path, monitor):
+    def test_calculates_growth_rate(self, sessions_dir, monitor, clock):
         """Calculates growth rate between measurements."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
         session_file = sessions_dir / "growing.jsonl"
 
         # Initial content
-        with open(session_file, "w") as f:
-            f.write("initial content\n")
+        session_file.write_text("initial content\n")
+        health1 = monitor.analyze_session(session_file)
 
-        # First measurement
-        health1 = monitor.analyze_session(str(session_file))
-
-        # Add more content
+        # Add more content, measured exactly one minute later
         with open(session_file, "a") as f:
             f.write("additional content " * 1000 + "\n")
+        clock[0] += 60
 
-        # Second measurement (simulating time passed)
-        health2 = monitor.analyze_session(str(session_file))
+        health2 = monitor.analyze_session(session_file)
 
-        # Growth rate should be calculable
-        assert health2.size_bytes > health1.size_bytes
+        assert health2.file_size_kb > health1.file_size_kb
+        assert health2.growth_rate_kb_per_min == health2.file_size_kb - health1.file_size_kb
 
-    def test_requires_two_data_points(self, tmp_path, monitor):
+    def test_requires_two_data_points(self, sessions_dir, monitor):
         """Needs at least two measurements for growth rate."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
         session_file = sessions_dir / "new.jsonl"
 
-        with open(session_file, "w") as f:
-            f.write("content\n")
+        session_file.write_text("content\n")
 
         health = monitor.analyze_session(str(session_file))
 
@@ -311,19 +233,15 @@ class TestSessionMonitorDiscovery:
     """Tests for session discovery."""
 
     @pytest.fixture
-    def monitor(self, tmp_path):
+    def monitor(self, sessions_dir):
         """Create SessionMonitor with multiple sessions."""
-        openclaw_home = tmp_path / "openclaw"
-        sessions_dir = openclaw_home / "agents" / "main" / "sessions"
-        sessions_dir.mkdir(parents=True)
-
         # Create various session files
         (sessions_dir / "session1.jsonl").write_text('{"type":"message"}\n')
         (sessions_dir / "session2.jsonl").write_text('{"type":"message"}\n')
         (sessions_dir / "sessions.json").write_text("[]")  # Metadata file
         (sessions_dir / ".archived.old.jsonl").write_text('{"type":"message"}\n')
 
-        return SessionMonitor(openclaw_home=str(openclaw_home))
+        return SessionMonitor(sessions_dir=sessions_dir)
 
     def test_finds_all_sessions(self, monitor):
         """Finds all session files."""
@@ -352,22 +270,11 @@ class TestSessionMonitorDiscovery:
 class TestSessionMonitorAlerts:
     """Tests for alert generation."""
 
-    @pytest.fixture
-    def monitor(self, tmp_path):
-        """Create SessionMonitor."""
-        openclaw_home = tmp_path / "openclaw"
-        sessions_dir = openclaw_home / "agents" / "main" / "sessions"
-        sessions_dir.mkdir(parents=True)
-        return SessionMonitor(openclaw_home=str(openclaw_home))
-
-    def test_returns_warnings_and_criticals(self, tmp_path, monitor):
+    def test_returns_warnings_and_criticals(self, sessions_dir, monitor):
         """Returns sessions with warning or critical status."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
-
         # Create a critical session (large file)
         large_file = sessions_dir / "large.jsonl"
-        with open(large_file, "w") as f:
-            f.write("x" * (11 * 1024 * 1024))
+        _make_sized_file(large_file, 11 * 1024 * 1024)
 
         # Create a healthy session
         healthy_file = sessions_dir / "healthy.jsonl"
@@ -379,10 +286,8 @@ class TestSessionMonitorAlerts:
         alert_sessions = [a.session_id for a in alerts]
         assert "large" in alert_sessions or "large.jsonl" in alert_sessions
 
-    def test_excludes_healthy_from_alerts(self, tmp_path, monitor):
+    def test_excludes_healthy_from_alerts(self, sessions_dir, monitor):
         """Excludes healthy sessions from alerts."""
-        sessions_dir = tmp_path / "openclaw" / "agents" / "main" / "sessions"
-
         # Create only healthy sessions
         (sessions_dir / "healthy1.jsonl").write_text('{"type":"message"}\n')
         (sessions_dir / "healthy2.jsonl").write_text('{"type":"message"}\n')
@@ -392,3 +297,268 @@ class TestSessionMonitorAlerts:
         # Should be empty or only contain the sessions we created
         for alert in alerts:
             assert alert.status != "healthy"
+
+
+class TestSessionScan:
+    """Tests for the session file scan in analyze_session."""
+
+    @pytest.fixture
+    def monitor(self, tmp_path):
+        """Create SessionMonitor over an empty sessions directory."""
+        return SessionMonitor(sessions_dir=tmp_path)
+
+    def write_session(self, path, entries):
+        """Write entries as JSONL using stdlib json's default spacing."""
+        path.write_text("".join(
+            (json.dumps(entry) if isinstance(entry, dict) else entry) + "\n" for entry in entries
+        ))
+
+    def test_counts_messages_and_model(self, tmp_path, monitor):
+        """Message entries are counted and the last model wins."""
+        session_file = tmp_path / "s.jsonl"
+        self.write_session(session_file, [
+            {"type": "session", "id": "s"},
+            {"type": "message", "model": "claude-haiku-3-5", "message": {"role": "user", "content": "hi"}},
+            '{"type":"message","model":"claude-sonnet-4","message":{"role":"assistant","content":"hello"}}',
+            "not json, but mentions \"message\"",
+        ])
+
+        health = monitor.analyze_session(session_file)
+
+        assert health.message_count == 2
+        assert health.injection_count == 0
+
+    def test_counts_injection_blocks(self, tmp_path, monitor):
+        """Injection blocks in user messages are counted per message."""
+        block = "[INJECTION-DEPTH:1] header Recovered Conversation Context"
+        session_file = tmp_path / "s.jsonl"
+        self.write_session(session_file, [
+            {"type": "message", "message": {"role": "user", "content": block}},
+            {"type": "message", "message": {"role": "user", "content": block + " " * 300 + block}},
+            {"type": "message", "message": {"role": "assistant", "content": block}},
+        ])
+
+        health = monitor.analyze_session(session_file)
+
+        assert health.injection_count == 3
+        assert health.max_nested_injections == 2
+        assert health.status == "CRITICAL"
+
+    def test_marker_without_header_is_not_an_injection(self, tmp_path, monitor):
+        """The marker alone, or too far from a depth header, is not a block."""
+        session_file = tmp_path / "s.jsonl"
+        self.write_session(session_file, [
+            {"type": "message", "message": {"role": "user", "content": "Recovered Conversation Context"}},
+            {"type": "message", "message": {"role": "user",
+                                            "content": "[INJECTION-DEPTH:1]" + "x" * 250 + "Recovered Conversation Context"}},
+        ])
+
+        health = monitor.analyze_session(session_file)
+
+        assert health.injection_count == 0
+
+
+class TestSessionScanCache:
+    """Tests for incremental re-analysis of session files."""
+
+    @pytest.fixture
+    def monitor(self, tmp_path):
+        """Create SessionMonitor over an empty sessions directory."""
+        return SessionMonitor(sessions_dir=tmp_path)
+
+    @staticmethod
+    def message(content="hello", role="user"):
+        return json.dumps({"type": "message", "message": {"role": role, "content": content}}) + "\n"
+
+    def test_unchanged_file_is_not_reread(self, tmp_path, monitor):
+        """A file with the same size and mtime returns the cached counters."""
+        session_file = tmp_path / "s.jsonl"
+        session_file.write_text(self.message())
+        monitor.analyze_session(session_file)
+
+        with patch("builtins.open", side_effect=AssertionError("re-read")):
+            health = monitor.analyze_session(session_file)
+
+        assert health.message_count == 1
+
+    def test_appended_lines_are_added(self, tmp_path, monitor):
+        """Lines appended after a scan are counted on the next one."""
+        session_file = tmp_path / "s.jsonl"
+        session_file.write_text(self.message() * 2)
+        assert monitor.analyze_session(session_file).message_count == 2
+
+        with open(session_file, "a") as f:
+            f.write(self.message() * 3)
+
+        assert monitor.analyze_session(session_file).message_count == 5
+
+    def test_partial_line_is_picked_up_once_complete(self, tmp_path, monitor):
+        """A line still being written is counted once it is finished."""
+        session_file = tmp_path / "s.jsonl"
+        line = self.message()
+        session_file.write_text(line + line[:10])
+        assert monitor.analyze_session(session_file).message_count == 1
+
+        with open(session_file, "a") as f:
+            f.write(line[10:])
+
+        assert monitor.analyze_session(session_file).message_count == 2
+
+    def test_rewritten_file_is_rescanned(self, tmp_path, monitor):
+        """A file that shrank is scanned from the start."""
+        session_file = tmp_path / "s.jsonl"
+        session_file.write_text(self.message() * 4)
+        monitor.analyze_session(session_file)
+
+        session_file.write_text(self.message())
+
+        assert monitor.analyze_session(session_file).message_count == 1
+
+    def test_recreated_file_is_rescanned(self, tmp_path, monitor):
+        """A session archived and recreated at the same path is scanned afresh, even if larger."""
+        session_file = tmp_path / "s.jsonl"
+        session_file.write_text(self.message("[INJECTION-DEPTH:1] Recovered Conversation Context"))
+        assert monitor.analyze_session(session_file).injection_count == 1
+
+        session_file.rename(tmp_path / "s.archived.jsonl")
+        session_file.write_text(self.message("a much longer message than the one archived") * 2)
+
+        health = monitor.analyze_session(session_file)
+        assert (health.message_count, health.injection_count) == (2, 0)
+
+    def test_failed_read_is_retried(self, tmp_path, monitor):
+        """Counters from a scan cut short by a read error aren't cached as complete."""
+        import session_monitor
+        session_file = tmp_path / "s.jsonl"
+        session_file.write_text(self.message() * 3)
+        line_size = len(self.message())
+        pread = os.pread
+
+        def failing_pread(fd, size, offset):
+            if offset >= line_size:
+                raise OSError("I/O error")
+            return pread(fd, size, offset)
+
+        with patch.object(session_monitor, "READ_CHUNK_SIZE", line_size), \
+                patch.object(session_monitor.os, "pread", failing_pread):
+            assert monitor.analyze_session(session_file).message_count == 1
+
+        assert monitor.analyze_session(session_file).message_count == 3
+
+
+class TestGetAllSessions:
+    """Tests for analyzing every session in the directory."""
+
+    def test_analyzes_every_session(self, tmp_path):
+        """All eligible sessions are analyzed, skipping metadata and archives."""
+        for i in range(12):
+            (tmp_path / f"session{i}.jsonl").write_text(
+                json.dumps({"type": "message", "message": {"role": "user", "content": "x"}}) + "\n" * (i + 1)
+            )
+        (tmp_path / "old.archived.jsonl").write_text('{"type": "message"}\n')
+
+        sessions = SessionMonitor(sessions_dir=tmp_path).get_all_sessions()
+
+        assert sorted(s.session_id for s in sessions) == sorted(f"session{i}" for i in range(12))
+        assert all(s.message_count == 1 for s in sessions)
+
+    def test_unreadable_session_is_skipped(self, tmp_path):
+        """A session that fails to analyze is left out of the results."""
+        (tmp_path / "good.jsonl").write_text('{"type": "message"}\n')
+        (tmp_path / "bad.jsonl").write_text('{"type": "message"}\n')
+        monitor = SessionMonitor(sessions_dir=tmp_path)
+        analyze = monitor.analyze_session
+
+        def flaky(session_file):
+            if session_file.stem == "bad":
+                raise OSError("gone")
+            return analyze(session_file)
+
+        monitor.analyze_session = flaky
+
+        assert [s.session_id for s in monitor.get_all_sessions()] == ["good"]
+
+
+class TestScanSessionBytes:
+    """Tests for the state-free session scanner."""
+
+    def test_counts_and_consumed_bytes(self):
+        """Complete lines are consumed; a partial trailing line is not."""
+        line = b'{"type": "message", "model": "m1", "message": {"role": "user", "content": "hi"}}\n'
+        data = line * 2 + b'[1, 2]\n' + line[:15]
+
+        assert _scan_session_bytes(data) == (2, 0, 0, "m1", len(data) - 15)
+
+    def test_complete_line_without_newline_is_consumed(self):
+        """A final record missing its newline still counts."""
+        data = b'{"type": "message", "message": {"role": "assistant"}}'
+
+        assert _scan_session_bytes(data) == (1, 0, 0, None, len(data))
+
+    def test_chunked_reads_match_single_read(self, tmp_path, monkeypatch):
+        """Records split across read chunks are counted once."""
+        import session_monitor
+        block = "[INJECTION-DEPTH:1] Recovered Conversation Context"
+        session_file = tmp_path / "s.jsonl"
+        session_file.write_text("".join(
+            json.dumps({"type": "message", "model": f"m{i}",
+                        "message": {"role": "user", "content": block if i % 2 else "hi"}}) + "\n"
+            for i in range(20)
+        ))
+        whole = SessionMonitor(sessions_dir=tmp_path).analyze_session(session_file)
+
+        monkeypatch.setattr(session_monitor, "READ_CHUNK_SIZE", 7)
+        chunked = SessionMonitor(sessions_dir=tmp_path).analyze_session(session_file)
+
+        assert (chunked.message_count, chunked.injection_count) == (whole.message_count, whole.injection_count) == (20, 10)
+
+
+class TestGrowthHistory:
+    """Tests for the per-session size history behind the growth rate."""
+
+    def test_rate_from_oldest_sample_in_window(self, tmp_path, clock):
+        """Growth is measured from the oldest sample in the last five minutes."""
+        monitor = SessionMonitor(sessions_dir=tmp_path)
+
+        assert monitor._calculate_growth_rate("s", 100) == 0.0
+        clock[0] += 60
+        assert monitor._calculate_growth_rate("s", 400) == pytest.approx(300.0)
+        clock[0] += 270
+        # The first sample is now older than five minutes and drops out
+        assert monitor._calculate_growth_rate("s", 1300) == pytest.approx(900 / 4.5)
+        assert len(monitor.size_history["s"]) == 2
+
+    def test_history_is_bounded(self, tmp_path, clock):
+        """Rapid polling keeps about GROWTH_HISTORY_SAMPLES samples, however many polls land in the window."""
+        monitor = SessionMonitor(sessions_dir=tmp_path)
+
+        for i in range(monitor.GROWTH_WINDOW_SECONDS * 20):
+            clock[0] += 0.1
+            monitor._calculate_growth_rate("s", i)
+
+        assert monitor.GROWTH_HISTORY_SAMPLES <= len(monitor.size_history["s"]) < 2 * monitor.GROWTH_HISTORY_SAMPLES
+
+    def test_rapid_polling_still_measures_growth(self, tmp_path, clock):
+        """Samples cover the whole window however often the monitor polls."""
+        monitor = SessionMonitor(sessions_dir=tmp_path)
+
+        for i in range(1000):
+            clock[0] += 0.05
+            rate = monitor._calculate_growth_rate("s", i)
+
+        # 1 KB every 50 ms is 1200 KB/min
+        assert rate == pytest.approx(1200, rel=0.05)
+
+    def test_archived_sessions_are_forgotten(self, tmp_path):
+        """History and scan counters go once a session leaves the listing."""
+        for name in ("kept", "archived"):
+            (tmp_path / f"{name}.jsonl").write_text('{"type": "message"}\n')
+        monitor = SessionMonitor(sessions_dir=tmp_path)
+        monitor.get_all_sessions()
+        assert set(monitor.size_history) == {"kept", "archived"}
+
+        (tmp_path / "archived.jsonl").rename(tmp_path / "archived.archived.jsonl")
+        monitor.get_all_sessions()
+
+        assert set(monitor.size_history) == {"kept"}
+        assert list(monitor._scan_cache) == [str(tmp_path / "kept.jsonl")]